@@ -0,0 +1,107 @@
+from urllib.parse import urlparse
+import asyncio
+import time
+
+from config import load_config
+from run_control import RunCancelled
+from scraper_pool import ScraperPool
+
+
+class HostRateLimiter:
+    """Token bucket per host, so lookups against one site stay under a fixed request rate."""
+
+    def __init__(self, rate_per_second, burst=1):
+        """
+        Args:
+          - rate_per_second: Sustained requests per second allowed per host (0 disables the limit).
+          - burst: Requests that may go out back to back before the rate applies.
+        """
+        self.rate = rate_per_second
+        self.burst = max(1, burst)
+        self._buckets = {}  # host -> [tokens, last refill time]
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, host, tokens=1):
+        """Wait until `tokens` requests may be sent to `host`."""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            bucket = self._buckets.setdefault(host, [float(self.burst), time.monotonic()])
+            while True:
+                now = time.monotonic()
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+                if bucket[0] >= tokens or bucket[0] >= self.burst:
+                    bucket[0] -= tokens
+                    return
+                await asyncio.sleep((min(tokens, self.burst) - bucket[0]) / self.rate)
+
+
+class AsyncScrapeEngine(ScraperPool):
+    def __init__(self, website_url=None, contexts=None, rate_per_second=None,
+                 backend=None, headless=True, scraper_factory=None):
+        """Initialize an asyncio engine running the per-country lookups as coroutines under a per-host rate limit.
+
+        Each lookup (select country, then provider / radio / submit / check for each provider)
+        is a coroutine that borrows one of `contexts` scrapers and runs the blocking scraper
+        calls in a thread, so at most `contexts` lookups are in flight at once. Before it starts,
+        a lookup takes one token per provider it will submit from a per-host rate limit, which
+        keeps the sustained postback rate under the limit (a country's own postbacks still go
+        out back to back). Queuing known results, storing results and the end-of-pass retry
+        are the ScraperPool's.
+
+        Args:
+          - website_url: Document checklist website URL passed to every scraper.
+          - contexts: Scrapers (browsers or HTTP sessions), and so lookups in flight at once (ASYNC_CONTEXTS, default 4).
+          - rate_per_second: Postbacks per second per host (ASYNC_RATE_LIMIT, default 2; 0 disables).
+          - backend / headless / scraper_factory: As for ScraperPool.
+        """
+        config = load_config()
+        contexts = int(contexts or config.get("ASYNC_CONTEXTS") or 4)
+        ScraperPool.__init__(self, website_url=website_url, workers=contexts, headless=headless,
+                             scraper_factory=scraper_factory, backend=backend)
+        rate = rate_per_second if rate_per_second is not None else float(config.get("ASYNC_RATE_LIMIT", "2"))
+        self.rate_limiter = HostRateLimiter(rate, burst=self.workers)
+
+    def _run_work(self, items, excel_handler):
+        """Run [(country, [providers])] as coroutines, store the results and return the failed lookups in the same shape."""
+        return asyncio.run(self._run_lookups(items, excel_handler))
+
+    async def _run_lookups(self, items, excel_handler):
+        """Coroutine behind _run_work."""
+        total = sum(len(pending) for _, pending in items)
+        idle = asyncio.Queue()
+        for scraper in self.scrapers:
+            idle.put_nowait(scraper)
+        host = urlparse(self.website_url or "").netloc
+        failed = {}
+        done = 0
+
+        async def lookup(country, pending):
+            nonlocal done
+            # The idle queue bounds the lookups in flight to the number of contexts
+            scraper = await idle.get()
+            try:
+                # Checked once a context is free, so lookups queued behind it stop on a pause or cancel
+                if self.control:
+                    await asyncio.to_thread(self.control.checkpoint)
+                # One token per provider postback of this country
+                await self.rate_limiter.acquire(host, len(pending))
+                results = await asyncio.to_thread(self._lookup, scraper, country, pending)
+            finally:
+                idle.put_nowait(scraper)
+            # Results are stored from the event loop, so one thread writes the ExcelHandler
+            for result in results:
+                done += 1
+                self._record_result(excel_handler, result, done, total, failed)
+
+        tasks = [asyncio.create_task(lookup(country, pending)) for country, pending in items]
+        try:
+            await asyncio.gather(*tasks)
+        except RunCancelled:
+            # Stop the lookups still queued or waiting on the rate limit before the run returns
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return list(failed.items())
@@ -0,0 +1,364 @@
+import hashlib
+import time
+
+from browser_recycler import BrowserRecycler
+from config import load_config
+from retry_policy import RetryPolicy
+
+# Values stored per (country, provider): evidence required, not required, or lookup failed
+RESULT_YES = "Y"
+RESULT_NO = "N"
+RESULT_ERROR = "ERROR"
+
+# Headings that only appear when a student has to provide additional evidence
+EVIDENCE_HEADINGS = ("evidence of financial capacity", "evidence of english language ability")
+
+# Available scraper backends, selectable with SCRAPER_BACKEND
+BACKENDS = ("selenium", "http")
+
+# create_scraper options that only apply to a browser
+BROWSER_OPTIONS = ("headless", "profile_name", "debugger_address")
+
+
+class BaseScraper:
+    """Shared lookup workflow for every scraper backend.
+
+    Subclasses implement open_website, select_country, select_education_provider,
+    select_radio_option, click_display_evidence, check_evidence_on_page and close_browser,
+    and restart_browser / browser_rss_mb for browser recycling.
+    """
+
+    def __init__(self):
+        """Initialize the state shared by all backends."""
+        self.name = "scraper"  # Label of this scraper in the gauges (pool workers are worker0, worker1, ...)
+        self.wait_log = []  # List of (step, seconds_waited, timed_out)
+        self.current_provider = None  # Provider currently chosen in the provider dropdown
+        self.cache = None  # Optional ResultCache consulted before going to the site
+        self.journal = None  # Optional RunJournal receiving every completed lookup
+        self.manifest = None  # Optional RunManifest carrying results forward in diff mode
+        self.metrics = None  # Optional StepMetrics recording every step call
+        self.control = None  # Optional RunControl for pausing / cancelling and progress reports
+        self.tier_learner = None  # Optional TierLearner answering lookups from the country's risk tier
+        self.provider_profiler = None  # Optional ProviderProfiler answering lookups from the provider's tier
+        self.last_fingerprint = None  # Fingerprint of the evidence section read by check_evidence_on_page
+        self.fingerprints = {}  # provider -> evidence fingerprint from the last check_country_providers call
+        self.last_evidence = None  # Structured record of the evidence section read by check_evidence_on_page
+        self.evidence = {}  # provider -> evidence record from the last lookup_country / check_country_providers call
+        self.remembered = {}  # provider -> "tier" / "provider_profile" for answers of the last lookup_country call given without a lookup
+        self.current_lookup = (None, None)  # (country, provider) being looked up, for the metrics
+        self.step_retries = 0  # Retries taken by the step currently running
+        self.retry_policy = RetryPolicy()  # Retries and backoff for failing steps (None disables)
+        # Relaunches the browser between countries once it grows too large or slow (BROWSER_RECYCLE)
+        self.recycler = BrowserRecycler() if load_config().browser_recycling else None
+        # Spreadsheet name -> (option value, option text) resolved ahead of the run by NameResolver
+        self.resolved_options = {"countries": {}, "providers": {}}
+        self.name_resolver = None  # NameResolver the options came from, rebuilt if the site's dropdown changes
+
+    def process_countries(self, countries, excel_handler, provider):
+        """
+        Loops through all countries, performs checks, and updates the ExcelHandler.
+        
+        Args:
+          - countries: List of country names from the ExcelHandler.
+          - excel_handler: Instance of ExcelHandler to store UNI1 and UNI2 results.
+          - provider: The education provider to select (university name from GUI or .env).
+        """
+        failed = {}
+        for country in countries:
+            self.checkpoint()
+            value = stored_result(country, provider, self.journal, self.cache, self.manifest)
+            if value is not None:
+                print(f"Using stored result for {country} with provider {provider}: {value}")
+                self._store_result(excel_handler, country, provider, value)
+            else:
+                print(f"Processing country: {country} with provider: {provider}")
+                value = self.lookup_country(country, [provider])[provider]
+                self._store_result(excel_handler, country, provider, value, scraped=provider not in self.remembered,
+                                   details=self.evidence.get(provider))
+                if value == RESULT_ERROR:
+                    failed[country] = [provider]
+
+        self.retry_failed(failed, excel_handler)
+        print(f"All countries processed for provider: {provider}")
+
+    def process_all_providers(self, countries, excel_handler, providers):
+        """
+        Loops through all countries once, checking every provider before moving to the next country.
+
+        The passport country is selected once per country and only the provider dropdown is
+        swapped between lookups, so the country search runs once per country instead of once
+        per (country, provider) pair.
+
+        Args:
+          - countries: List of country names from the ExcelHandler.
+          - excel_handler: Instance of ExcelHandler to store the results.
+          - providers: List of education providers to check for each country.
+        """
+        failed = {}
+        for country in countries:
+            self.checkpoint()
+            pending = []
+            for provider in providers:
+                value = stored_result(country, provider, self.journal, self.cache, self.manifest)
+                if value is not None:
+                    self._store_result(excel_handler, country, provider, value)
+                else:
+                    pending.append(provider)
+
+            if not pending:
+                print(f"Using stored results for {country}.")
+                continue
+
+            print(f"Processing country: {country} with providers: {', '.join(pending)}")
+            for provider, value in self.lookup_country(country, pending).items():
+                self._store_result(excel_handler, country, provider, value, scraped=provider not in self.remembered,
+                                   details=self.evidence.get(provider))
+                if value == RESULT_ERROR:
+                    failed.setdefault(country, []).append(provider)
+
+        self.retry_failed(failed, excel_handler)
+        print(f"All countries processed for providers: {', '.join(providers)}")
+
+    def retry_failed(self, failed, excel_handler):
+        """Retry failed lookups ({country: [providers]}) as one batch on a freshly loaded page.
+
+        Pairs that fail again keep the ERROR status, which is written to the output.
+        """
+        if not failed:
+            return
+        print(f"Retrying {sum(len(providers) for providers in failed.values())} failed lookups...")
+        self.open_website()
+        for country, providers in failed.items():
+            self.checkpoint()
+            for provider, value in self.check_country_providers(country, providers).items():
+                self._store_result(excel_handler, country, provider, value, scraped=True,
+                                   details=self.evidence.get(provider))
+                if value == RESULT_ERROR:
+                    print(f"Lookup still failing for {country} with provider {provider}; marked as {RESULT_ERROR}.")
+
+    def _store_result(self, excel_handler, country, provider, value, scraped=False, details=None):
+        """Write a result to the ExcelHandler and journal, and to the cache if it was just scraped
+        (not answered from memory by the tier learner or provider profiler).
+
+        `details` is the structured evidence record of the lookup; for a stored result it is
+        taken from the cache when available. Failed lookups only go to the ExcelHandler, so a
+        later or resumed run tries them again.
+        """
+        if details is None and not scraped and self.cache:
+            details = self.cache.get_details(country, provider)
+        excel_handler.set_provider_value(country, provider, value, details)
+        if self.control:
+            self.control.report(country, provider, value)
+        if value == RESULT_ERROR:
+            return
+        if scraped and self.cache:
+            self.cache.put(country, provider, value, details)
+        record_result(country, provider, value, self.journal)
+
+    def checkpoint(self):
+        """Wait here while the run is paused and raise RunCancelled if it was cancelled."""
+        if self.control:
+            self.control.checkpoint()
+
+    def lookup_country(self, country, providers):
+        """Return {provider: value} for one country, answering from the provider profiler or the
+        tier learner where they can and looking up the remaining providers on the website.
+
+        The providers answered without a lookup are left in `remembered`; their values are not
+        written to the result cache, and their evidence record only names where the answer came
+        from ({"source": "tier"} or {"source": "provider_profile"}).
+        """
+        values = {}
+        self.remembered = {}
+        self.fingerprints = {}
+        self.evidence = {}  # Nothing from an earlier country may be stored against this one
+        if self.provider_profiler:
+            for provider in providers:
+                value = self.provider_profiler.answer(country, provider)
+                if value is not None:
+                    values[provider] = value
+                    self.remembered[provider] = "provider_profile"
+        if self.tier_learner:
+            for provider in providers:
+                if provider in values:
+                    continue
+                value = self.tier_learner.answer(country, provider)
+                if value is not None:
+                    values[provider] = value
+                    self.remembered[provider] = "tier"
+        live = [provider for provider in providers if provider not in values]
+        if live:
+            values.update(self.check_country_providers(country, live))
+            if self.tier_learner:
+                for provider in live:
+                    if values[provider] != RESULT_ERROR:
+                        self.tier_learner.observe(country, provider, self.fingerprints.get(provider), values[provider],
+                                                  (self.evidence.get(provider) or {}).get("risk_levels"))
+        for provider, source in self.remembered.items():
+            self.evidence[provider] = {"source": source}
+        return {provider: values[provider] for provider in providers}
+
+    def check_country_providers(self, country, providers):
+        """Select a country once and run the lookup for each provider.
+
+        Returns {provider: RESULT_YES / RESULT_NO / RESULT_ERROR}; a failed step only fails the
+        lookups it belongs to (all of them when the country itself could not be selected).
+        """
+        self.maybe_recycle_browser()
+        self.current_lookup = (country, None)
+        self.fingerprints = {}
+        self.evidence = {}
+        try:
+            self.select_country(country)
+        except Exception:
+            return {provider: RESULT_ERROR for provider in providers}
+
+        results = {}
+        for provider in providers:
+            try:
+                results[provider] = RESULT_YES if self.check_selected_country(provider) else RESULT_NO
+                self.fingerprints[provider] = self.last_fingerprint
+                self.evidence[provider] = self.last_evidence
+            except Exception:
+                self.current_provider = None  # The provider dropdown state is unknown after a failure
+                results[provider] = RESULT_ERROR
+        return results
+
+    def check_selected_country(self, provider):
+        """Run the lookup for the country already selected and return True if evidence is required.
+
+        The provider dropdown is only changed when it differs from the provider already selected.
+        """
+        self.current_lookup = (self.current_lookup[0], provider)
+        if provider != self.current_provider:  # Select institution only when it changes
+            self.select_education_provider(provider)
+            self.current_provider = provider
+
+        self.select_radio_option()
+        started = time.perf_counter()
+        self.click_display_evidence()
+        evidence_required = self.check_evidence_on_page()
+        if self.recycler:
+            self.recycler.record_request(time.perf_counter() - started)
+        return evidence_required
+
+    def maybe_recycle_browser(self):
+        """Relaunch the browser if its memory, postback count or latency crossed the recycler's
+        thresholds, and publish the recycler's figures as gauges. Runs between countries, so the
+        next lookup selects its country on the fresh page and no form state is lost."""
+        if not self.recycler:
+            return
+        reason = self.recycler.check(self.browser_rss_mb())
+        if reason:
+            print(f"Relaunching the browser of {self.name}: {reason}")
+            if self.metrics is not None:
+                with self.metrics.measure("restart_browser"):
+                    self.restart_browser()
+            else:
+                self.restart_browser()
+            self.current_provider = None
+            self.recycler.recycled(reason)
+        if self.metrics is not None:
+            for gauge, value in self.recycler.gauges().items():
+                self.metrics.gauge(f"{self.name}.{gauge}", value)
+
+    def browser_rss_mb(self):
+        """Memory of the browser behind this scraper in MB, or None if the backend has none to measure."""
+        return None
+
+    def restart_browser(self):
+        """Quit and relaunch the browser (or session) and load the website again."""
+        raise NotImplementedError
+
+    def wait_summary(self):
+        """Return total/average/max seconds waited and timeout count per step."""
+        summary = {}
+        for step, seconds, timed_out in self.wait_log:
+            entry = summary.setdefault(step, {"count": 0, "total": 0.0, "max": 0.0, "timeouts": 0})
+            entry["count"] += 1
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+            entry["timeouts"] += int(timed_out)
+        for entry in summary.values():
+            entry["average"] = entry["total"] / entry["count"]
+        return summary
+
+    def print_wait_summary(self):
+        """Print how long each step spent waiting on the page."""
+        print("\nWait time per step:")
+        for step, entry in self.wait_summary().items():
+            print(f"  {step:<15} calls={entry['count']:<5} total={entry['total']:.2f}s "
+                  f"avg={entry['average']:.3f}s max={entry['max']:.3f}s timeouts={entry['timeouts']}")
+
+    def set_resolved_options(self, countries, providers, resolver=None):
+        """Use pre-resolved dropdown options so countries and providers are picked by option value."""
+        self.resolved_options = {"countries": dict(countries), "providers": dict(providers)}
+        if resolver is not None:
+            self.name_resolver = resolver
+
+    def refresh_resolved_options(self):
+        """Rebuild the option index after a resolved option no longer matched the page, and re-resolve.
+
+        Without a resolver the resolved options are dropped, so later lookups select by text.
+        """
+        print("The website's dropdown options no longer match the option index; rebuilding it.")
+        if self.name_resolver is None:
+            self.resolved_options = {kind: {} for kind in self.resolved_options}
+            return
+        self.name_resolver.rebuild(self.fetch_option_lists)
+        self.resolved_options = {kind: self.name_resolver.resolve_all(list(names), kind, report=False)
+                                 for kind, names in self.resolved_options.items()}
+
+    @staticmethod
+    def native_select_id(container_id):
+        """Map a select2 container id (select2-X-container) to the id of the native select (X)."""
+        if container_id.startswith("select2-") and container_id.endswith("-container"):
+            return container_id[len("select2-"):-len("-container")]
+        return container_id
+
+    def count_retry(self):
+        """Note that the step currently running had to try again (reported by the step metrics)."""
+        self.step_retries += 1
+
+    @staticmethod
+    def headings_contain_evidence(headings):
+        """Return True if any of the given heading texts is an additional-evidence heading."""
+        texts = [heading.lower() for heading in headings]
+        return any(evidence in text for text in texts for evidence in EVIDENCE_HEADINGS)
+
+    @staticmethod
+    def fingerprint_headings(headings):
+        """Return a short hash identifying the evidence section by its headings."""
+        return hashlib.sha1("\n".join(headings).encode("utf-8")).hexdigest()[:16]
+
+
+def stored_result(country, provider, journal=None, cache=None, manifest=None):
+    """Return a result already known from the run journal, the last run (diff mode) or the cache, or None if it must be scraped."""
+    value = journal.get(country, provider) if journal else None
+    if value is None and manifest:
+        value = manifest.get(country, provider)
+        if value is None and manifest.is_sampled(country, provider):
+            return None  # Sampled pairs are re-checked on the website, not taken from the cache
+    if value is None and cache:
+        value = cache.get(country, provider)
+    return value
+
+
+def record_result(country, provider, value, journal=None):
+    """Append a result to the run journal unless it is already there."""
+    if journal and journal.get(country, provider) is None:
+        journal.record(country, provider, value)
+
+
+def create_scraper(backend=None, **kwargs):
+    """Create a scraper for the requested backend ('selenium' or 'http', falls back to the config's SCRAPER_BACKEND)."""
+    backend = (backend or load_config().backend).lower()
+    if backend == "selenium":
+        from web_scraper import WebScraper
+        return WebScraper(**kwargs)
+    if backend == "http":
+        from http_scraper import HttpScraper
+        for option in BROWSER_OPTIONS:
+            kwargs.pop(option, None)  # No browser to configure
+        return HttpScraper(**kwargs)
+    raise ValueError(f"Unknown scraper backend '{backend}'. Choose one of: {', '.join(BACKENDS)}")
@@ -0,0 +1,182 @@
+from excel_handler import ExcelHandler
+from result_cache import ResultCache
+from run_journal import RunJournal
+from instrumentation import StepMetrics
+from name_resolver import NameResolver
+from tier_learner import TierLearner
+from config import load_config
+from scraper_warmup import build_scraper, open_scraper
+import argparse
+import json
+import os
+
+
+class BatchJob:
+    """One workbook of a batch: its input sheet, the providers to check and where to write the results."""
+
+    def __init__(self, spec, base_dir="."):
+        """
+        Args:
+          - spec: Job entry from the manifest, with 'input', 'sheet', 'providers' and 'output'
+            (optionally 'name', 'results_sink', 'evidence_details' and 'update_input', true or "all").
+          - base_dir: Directory that relative paths in the job are resolved against.
+        """
+        missing = [key for key in ("input", "sheet", "providers", "output") if not spec.get(key)]
+        if missing:
+            raise ValueError(f"Batch job {spec.get('name') or spec} is missing: {', '.join(missing)}")
+        self.input_filename = os.path.join(base_dir, spec["input"])
+        self.sheet_name = spec["sheet"]
+        self.providers = list(dict.fromkeys(spec["providers"]))
+        self.output_filename = os.path.join(base_dir, spec["output"])
+        self.results_sink = os.path.join(base_dir, spec["results_sink"]) if spec.get("results_sink") else None
+        self.evidence_details = os.path.join(base_dir, spec["evidence_details"]) if spec.get("evidence_details") else None
+        self.update_input = spec.get("update_input") or False
+        self.name = spec.get("name") or os.path.basename(self.input_filename)
+        self.excel_handler = None
+
+    def load(self):
+        """Read the job's countries from its workbook."""
+        self.excel_handler = ExcelHandler(
+            filename=self.input_filename,
+            sheetname=self.sheet_name,
+            uni1_name=self.providers[0],
+            uni2_name=self.providers[1] if len(self.providers) > 1 else None,
+            providers=self.providers,
+        )
+        return self
+
+    def write_outputs(self):
+        """Write the job's results file, the optional results sink and evidence export and, if asked, the input workbook."""
+        if self.update_input:
+            self.excel_handler.save_to_excel(all_providers=self.update_input == "all")
+        self.excel_handler.export_to_excel(self.output_filename)
+        if self.results_sink:
+            self.excel_handler.export_results(self.results_sink)
+        if self.evidence_details:
+            self.excel_handler.export_evidence(self.evidence_details)
+
+
+class BatchResults:
+    """Stands in for ExcelHandler during a batch: hands each result to every job that needs that pair."""
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+
+    def set_provider_value(self, country, provider, value, details=None):
+        for job in self.jobs:
+            if (country, provider) in job.excel_handler.results:
+                job.excel_handler.set_provider_value(country, provider, value, details)
+
+
+def load_manifest(path):
+    """Read a batch manifest from a .json or .yaml/.yml file (YAML needs PyYAML)."""
+    with open(path, encoding="utf-8") as manifest_file:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("YAML batch manifests require PyYAML (pip install pyyaml), or use a .json manifest.")
+            return yaml.safe_load(manifest_file)
+        return json.load(manifest_file)
+
+
+def group_lookups(jobs):
+    """Merge the jobs' (country, provider) pairs and group countries by the providers they need.
+
+    Returns [(countries, providers)]: every pair needed by any job appears in exactly one group,
+    so a pair shared by several jobs is looked up once.
+    """
+    needed = {}  # country -> providers needed by any job, in first-seen order
+    for job in jobs:
+        for country in job.excel_handler.countries:
+            needed.setdefault(country, {}).update(dict.fromkeys(job.providers))
+
+    groups = {}
+    for country, providers in needed.items():
+        groups.setdefault(tuple(providers), []).append(country)
+    return [(countries, list(providers)) for providers, countries in groups.items()]
+
+
+def run_batch(manifest_path, resume=False, workers=None, backend=None):
+    """Run every job in a batch manifest with one shared scraper, cache and journal.
+
+    Returns the list of BatchJob objects once all outputs have been written.
+    """
+    config = load_config()
+    manifest = load_manifest(manifest_path)
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = [BatchJob(spec, base_dir).load() for spec in manifest.get("jobs", [])]
+    if not jobs:
+        raise ValueError(f"No jobs found in {manifest_path}")
+    website_url = manifest.get("website_url") or config.website_url
+    workers = int(workers or manifest.get("workers") or config.workers)
+    backend = backend or manifest.get("backend") or config.backend
+
+    groups = group_lookups(jobs)
+    countries = list(dict.fromkeys(country for group, _ in groups for country in group))
+    providers = list(dict.fromkeys(provider for _, group in groups for provider in group))
+    requested = sum(len(job.excel_handler.countries) * len(job.providers) for job in jobs)
+    unique = sum(len(group) * len(group_providers) for group, group_providers in groups)
+    print(f"Batch of {len(jobs)} jobs: {requested} lookups requested, {unique} after removing duplicates.")
+
+    cache = ResultCache(force_refresh=config.cache_refresh, website_url=website_url)
+    journal = RunJournal(resume=resume)
+    metrics = StepMetrics()
+    tier_learner = TierLearner() if config.tier_dedup else None
+
+    scraper = None
+    try:
+        scraper = build_scraper(config, website_url, workers=workers, backend=backend)
+        open_scraper(scraper)
+        scraper.cache = cache
+        scraper.journal = journal
+        scraper.metrics = metrics
+        scraper.tier_learner = tier_learner
+
+        resolver = NameResolver(website_url=website_url).load_or_build(scraper.fetch_option_lists)
+        scraper.set_resolved_options(resolver.resolve_all(countries, "countries"),
+                                     resolver.resolve_all(providers, "providers"), resolver)
+
+        results = BatchResults(jobs)
+        for group_countries, group_providers in groups:
+            scraper.process_all_providers(group_countries, results, group_providers)
+
+        scraper.print_wait_summary()
+        metrics.print_report()
+        metrics.write_trace(config.trace_path)
+        cache.print_summary()
+        if tier_learner:
+            tier_learner.print_summary()
+            tier_learner.save_learned()
+    finally:
+        if scraper is not None:
+            scraper.close_browser()
+        cache.close()
+        journal.close()
+
+    for job in jobs:
+        print(f"\nJob '{job.name}':")
+        job.excel_handler.results.print_summary()
+        job.write_outputs()
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several Country Risk Scraper jobs from one manifest.")
+    parser.add_argument("manifest", help="JSON or YAML file listing the jobs")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reload the run journal and skip (country, provider) pairs already completed")
+    parser.add_argument("--workers", type=int, help="Scrapers in the shared pool (falls back to SCRAPER_WORKERS)")
+    parser.add_argument("--backend", choices=["selenium", "http"], help="Scraper backend (falls back to SCRAPER_BACKEND)")
+    args = parser.parse_args()
+
+    jobs = run_batch(args.manifest, resume=args.resume, workers=args.workers, backend=args.backend)
+    print("\n" + "=" * 50)
+    print("BATCH COMPLETED SUCCESSFULLY!")
+    print("=" * 50)
+    for job in jobs:
+        print(f"✓ {job.name}: {job.output_filename}")
+
+
+if __name__ == "__main__":
+    main()
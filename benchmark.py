@@ -0,0 +1,184 @@
+from fixture_server import FixtureServer, DEFAULT_COUNTRIES, DEFAULT_PROVIDERS
+from base_scraper import create_scraper
+from scraper_pool import ScraperPool
+from async_engine import AsyncScrapeEngine
+from instrumentation import StepMetrics
+from result_store import ResultStore
+from tier_learner import TierLearner
+from provider_profiler import ProviderProfiler
+import argparse
+import json
+import random
+import resource
+import sys
+import time
+import tracemalloc
+
+
+class BenchmarkResults:
+    """Stands in for ExcelHandler during a benchmark: only collects the results."""
+
+    def __init__(self, countries, providers):
+        self.results = ResultStore(countries, providers)
+
+    def set_provider_value(self, country, provider, value, details=None):
+        self.results.set(country, provider, value, details)
+
+
+def build_countries(count, seed=0):
+    """Return {country: risk level} with `count` entries: the fixture defaults padded with synthetic names."""
+    rng = random.Random(seed)
+    countries = dict(list(DEFAULT_COUNTRIES.items())[:count])
+    for index in range(len(countries), count):
+        countries[f"Testland {index + 1:03d}"] = rng.randint(1, 3)
+    return countries
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process and of its finished child processes, in MB (Linux reports KB)."""
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return own, children
+
+
+def run_benchmark(backend="http", workers=1, countries=235, providers=2, delay=0.0, search_delay=0.0,
+                  mode="combined", trace_memory=False, engine="pool", rate=0.0, tier_dedup=False,
+                  provider_profiling=False):
+    """Run the scraper against a local FixtureServer and return the throughput figures.
+
+    With trace_memory the Python heap peak is measured with tracemalloc, which slows the run
+    down considerably, so wall time and memory should come from separate runs.
+    With provider_profiling the tier x country matrix is built from every fixture provider
+    level, as if earlier runs had checked a provider of each level in full.
+    """
+    country_levels = build_countries(countries)
+    provider_levels = dict(list(DEFAULT_PROVIDERS.items())[:providers])
+    country_names = list(country_levels)
+    provider_names = list(provider_levels)
+    results = BenchmarkResults(country_names, provider_names)
+    metrics = StepMetrics()
+    # The fixture's risk levels stand in for the imported country -> tier table
+    tier_learner = TierLearner(tiers=country_levels) if tier_dedup else None
+    provider_profiler = None
+
+    if trace_memory:
+        tracemalloc.start()
+    with FixtureServer(country_levels, provider_levels, delay=delay, search_delay=search_delay) as server:
+        if provider_profiling:
+            provider_profiler = ProviderProfiler(tiers={
+                f"level{level}": {country: "Y" if level + country_level >= 4 else "N"
+                                  for country, country_level in country_levels.items()}
+                for level in sorted(set(DEFAULT_PROVIDERS.values()))
+            })
+        started = time.perf_counter()
+        if engine == "async":
+            scraper = AsyncScrapeEngine(website_url=server.url, contexts=workers, backend=backend, rate_per_second=rate)
+            scraper.metrics = metrics
+            scraper.tier_learner = tier_learner
+            scraper.provider_profiler = provider_profiler
+            if provider_profiler:
+                provider_profiler.profile_run(scraper, results, country_names, provider_names)
+            scraper.process_all_providers(country_names, results, provider_names)
+        elif workers > 1:
+            scraper = ScraperPool(website_url=server.url, workers=workers, backend=backend)
+            scraper.metrics = metrics
+            scraper.tier_learner = tier_learner
+            scraper.provider_profiler = provider_profiler
+            if provider_profiler:
+                provider_profiler.profile_run(scraper, results, country_names, provider_names)
+            scraper.process_all_providers(country_names, results, provider_names)
+        else:
+            scraper = create_scraper(backend, website_url=server.url, headless=True)
+            scraper.metrics = metrics
+            scraper.tier_learner = tier_learner
+            scraper.provider_profiler = provider_profiler
+            scraper.open_website()
+            if provider_profiler:
+                provider_profiler.profile_run(scraper, results, country_names, provider_names)
+            if mode == "combined":
+                scraper.process_all_providers(country_names, results, provider_names)
+            else:
+                for provider in provider_names:
+                    scraper.process_countries(country_names, results, provider)
+        wall_time = time.perf_counter() - started
+        scraper.close_browser()
+        postbacks = server.postbacks
+
+        wrong = sum(
+            results.results.get(country, provider) != ("Y" if server.evidence_required(country, provider) else "N")
+            for country in country_names for provider in provider_names
+        )
+    python_peak = None
+    if trace_memory:
+        python_peak = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        tracemalloc.stop()
+    own_rss, children_rss = peak_rss_mb()
+
+    return {
+        "backend": backend,
+        "workers": workers,
+        "mode": "async" if engine == "async" else mode if workers == 1 else "pool",
+        "countries": countries,
+        "providers": providers,
+        "delay": delay,
+        "search_delay": search_delay,
+        "wall_time_s": round(wall_time, 3),
+        "countries_per_minute": round(countries / wall_time * 60, 1),
+        "lookups_per_minute": round(countries * providers / wall_time * 60, 1),
+        "postbacks": postbacks,
+        "wrong_results": wrong,
+        "tier_dedup": dict(tier_learner.stats) if tier_learner else None,
+        "provider_profiling": dict(provider_profiler.stats) if provider_profiler else None,
+        "python_peak_mb": python_peak,
+        "peak_rss_mb": round(own_rss, 1),
+        "children_peak_rss_mb": round(children_rss, 1),
+        "gauges": dict(metrics.gauges),
+        "steps": metrics.step_summary(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against a local mock of the web evidentiary tool.")
+    parser.add_argument("--backend", default="http", choices=["selenium", "http"])
+    parser.add_argument("--workers", type=int, default=1, help="Pool size (1 runs a single scraper)")
+    parser.add_argument("--countries", type=int, default=235, help="Number of passport countries to check")
+    parser.add_argument("--providers", type=int, default=2, choices=range(1, len(DEFAULT_PROVIDERS) + 1))
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds before each Display Evidence response")
+    parser.add_argument("--search-delay", type=float, default=0.0, help="Seconds before select2 lists search results")
+    parser.add_argument("--mode", default="combined", choices=["combined", "per-provider"],
+                        help="Single-scraper traversal: all providers per country, or one pass per provider")
+    parser.add_argument("--engine", default="pool", choices=["pool", "async"],
+                        help="Run workers as a thread pool or as the asyncio engine")
+    parser.add_argument("--rate", type=float, default=0.0, help="Async engine postbacks per second per host (0 = unlimited)")
+    parser.add_argument("--tier-dedup", action="store_true",
+                        help="Answer lookups from the country's risk tier once confirmed (fixture levels as the tier table)")
+    parser.add_argument("--provider-profiling", action="store_true",
+                        help="Match each provider to a tier of a matrix built from the fixture's provider levels")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Measure the Python heap peak with tracemalloc (slows the run down)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.backend, args.workers, args.countries, args.providers,
+                           args.delay, args.search_delay, args.mode, args.trace_memory, args.engine, args.rate,
+                           args.tier_dedup, args.provider_profiling)
+
+    print("\n" + "=" * 50)
+    print("BENCHMARK RESULTS")
+    print("=" * 50)
+    for key, value in report.items():
+        if key != "steps":
+            print(f"  {key:<22}{value}")
+    print("  step p50 / p90 (seconds):")
+    for step, entry in report["steps"].items():
+        print(f"    {step:<28}{entry['p50']:.4f} / {entry['p90']:.4f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+        print(f"Benchmark results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
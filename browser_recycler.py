@@ -0,0 +1,135 @@
+from collections import deque
+import os
+import statistics
+
+from config import load_config
+
+
+def process_tree_rss_mb(pid):
+    """Resident memory of a process and all its descendants in MB, or None if it cannot be read.
+
+    Uses psutil when it is installed and falls back to /proc on Linux.
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+            return sum(process.memory_info().rss for process in processes) / (1024 * 1024)
+        except psutil.Error:
+            return None
+    if not os.path.isdir("/proc"):
+        return None
+
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as stat:
+                # The parent pid follows the command name, which is wrapped in parentheses
+                parent = int(stat.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+
+    total_kb, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children.get(current, []))
+        try:
+            with open(f"/proc/{current}/status", encoding="utf-8") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            if current == pid:
+                return None
+    return total_kb / 1024
+
+
+class BrowserRecycler:
+    def __init__(self, max_rss_mb=None, max_requests=None, latency_factor=None, window=None):
+        """Initialize the thresholds deciding when a scraper's browser (or HTTP session) is relaunched.
+
+        Long runs make Chrome grow and slow down. The scraper reports every postback's latency
+        with record_request() and asks check() between countries; once the browser's memory,
+        the number of postbacks since launch or the recent latency crosses a threshold, the
+        scraper quits and relaunches its browser.
+
+        Args:
+          - max_rss_mb: Memory of the browser process tree that triggers a relaunch (BROWSER_MAX_RSS_MB, default 1500; 0 disables).
+          - max_requests: Postbacks after which the browser is relaunched (BROWSER_MAX_REQUESTS, default 500; 0 disables).
+          - latency_factor: Relaunch when the median of the last `window` postbacks is this many times
+            the median of the first `window` after launch (BROWSER_LATENCY_FACTOR, default 3; 0 disables).
+          - window: Postbacks in each latency median (BROWSER_LATENCY_WINDOW, default 20).
+        """
+        config = load_config()
+        self.max_rss_mb = float(max_rss_mb if max_rss_mb is not None else config.get("BROWSER_MAX_RSS_MB", "1500"))
+        self.max_requests = int(max_requests if max_requests is not None else config.get("BROWSER_MAX_REQUESTS", "500"))
+        self.latency_factor = float(latency_factor if latency_factor is not None
+                                    else config.get("BROWSER_LATENCY_FACTOR", "3"))
+        self.window = int(window or config.get("BROWSER_LATENCY_WINDOW", "20"))
+        self.recycles = 0
+        self.reasons = []  # Why each relaunch happened
+        self.peak_rss_mb = None
+        self.reset()
+
+    def reset(self):
+        """Start counting again for a freshly launched browser."""
+        self.requests = 0
+        self.rss_mb = None
+        self.baseline = []  # Latencies of the first `window` postbacks after launch
+        self.recent = deque(maxlen=self.window)
+
+    def record_request(self, seconds):
+        """Note one postback and how long it took."""
+        self.requests += 1
+        if len(self.baseline) < self.window:
+            self.baseline.append(seconds)
+        self.recent.append(seconds)
+
+    def latency(self):
+        """Return (baseline median, recent median) in seconds, or None before the baseline is complete."""
+        if len(self.baseline) < self.window:
+            return None
+        return statistics.median(self.baseline), statistics.median(self.recent)
+
+    def check(self, rss_mb=None):
+        """Return why the browser should be relaunched now, or None to keep it.
+
+        Args:
+          - rss_mb: Current memory of the browser process tree, if the backend can measure it.
+        """
+        if rss_mb is not None:
+            self.rss_mb = rss_mb
+            self.peak_rss_mb = max(self.peak_rss_mb or 0.0, rss_mb)
+            if self.max_rss_mb and rss_mb >= self.max_rss_mb:
+                return f"memory {rss_mb:.0f} MB >= {self.max_rss_mb:.0f} MB"
+        if self.max_requests and self.requests >= self.max_requests:
+            return f"{self.requests} postbacks since launch"
+        latency = self.latency()
+        if self.latency_factor and latency and latency[0] > 0 and latency[1] >= self.latency_factor * latency[0]:
+            return f"postback latency {latency[1]:.2f}s vs {latency[0]:.2f}s after launch"
+        return None
+
+    def recycled(self, reason):
+        """Count a relaunch and start measuring the new browser."""
+        self.recycles += 1
+        self.reasons.append(reason)
+        self.reset()
+
+    def gauges(self):
+        """Current figures for the step metrics: memory, postbacks since launch, latency and relaunches."""
+        latency = self.latency()
+        return {
+            "rss_mb": round(self.rss_mb, 1) if self.rss_mb is not None else None,
+            "peak_rss_mb": round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None,
+            "requests_since_launch": self.requests,
+            "recent_latency_s": round(latency[1], 3) if latency else None,
+            "recycles": self.recycles,
+        }
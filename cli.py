@@ -0,0 +1,132 @@
+from config import load_config
+from run_control import RunControl
+import argparse
+import contextlib
+import json
+import os
+import signal
+import sys
+import time
+
+# Exit codes of a headless run
+EXIT_OK = 0              # Every lookup returned Y or N
+EXIT_LOOKUP_ERRORS = 1   # The run completed but some lookups are marked ERROR
+EXIT_USAGE = 2           # Missing or invalid settings
+EXIT_FAILED = 3          # The run stopped with an unexpected error
+EXIT_CANCELLED = 130     # Stopped by SIGINT / SIGTERM; completed lookups are in the journal
+
+# Settings that can come from the config file, with the command-line option that overrides each
+SETTINGS = ("input", "sheet", "providers", "website_url", "output", "backend", "workers",
+            "refresh_cache", "resume", "diff", "update_input", "summary")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Run the Country Risk Scraper without a GUI or prompts, e.g. from cron or a container.")
+    parser.add_argument("--config", help="JSON or YAML file with any of the settings below (options override it)")
+    parser.add_argument("--input", help="Input Excel workbook")
+    parser.add_argument("--sheet", help="Sheet holding the countries in column A")
+    parser.add_argument("--providers", nargs="+", metavar="PROVIDER", help="Education providers to check")
+    parser.add_argument("--website-url", dest="website_url",
+                        help="Document checklist website (falls back to DOCUMENT_CHECKLIST_WEBSITE)")
+    parser.add_argument("--output", help="Results workbook to write")
+    parser.add_argument("--backend", choices=["selenium", "http"], help="Scraper backend (falls back to SCRAPER_BACKEND)")
+    parser.add_argument("--workers", type=int, help="Scrapers in the pool (falls back to SCRAPER_WORKERS)")
+    parser.add_argument("--refresh-cache", dest="refresh_cache", action="store_true", default=None,
+                        help="Ignore cached results and look every pair up again")
+    parser.add_argument("--resume", action="store_true", default=None,
+                        help="Reload the run journal and skip (country, provider) pairs already completed")
+    parser.add_argument("--diff", action="store_true", default=None,
+                        help="Only check pairs that are new since the last run, plus a rolling sample")
+    parser.add_argument("--update-input", dest="update_input", nargs="?", const=True, choices=["all"], default=None,
+                        help="Also write the first two providers' results back into columns B and C of the input "
+                             "workbook ('all' also writes further providers to columns D onwards, with a header)")
+    parser.add_argument("--summary", help="Write the JSON summary to this file instead of standard output")
+    return parser
+
+
+def load_settings(args):
+    """Merge the config file (if any) with the command-line options, which take precedence."""
+    settings = {}
+    if args.config:
+        from batch_runner import load_manifest
+        settings.update(load_manifest(args.config) or {})
+        unknown = sorted(set(settings) - set(SETTINGS))
+        if unknown:
+            raise ValueError(f"Unknown settings in {args.config}: {', '.join(unknown)}")
+    settings.update({key: value for key, value in vars(args).items() if key in SETTINGS and value is not None})
+    if isinstance(settings.get("providers"), str):
+        settings["providers"] = [name.strip() for name in settings["providers"].split(",") if name.strip()]
+
+    missing = [key for key in ("input", "sheet", "providers", "output") if not settings.get(key)]
+    if missing:
+        raise ValueError(f"Missing settings: {', '.join(missing)}")
+    if not os.path.exists(settings["input"]):
+        raise ValueError(f"Input workbook not found: {settings['input']}")
+    return settings
+
+
+def write_summary(summary, path=None):
+    """Write the JSON summary to `path`, or as a single line to standard output."""
+    if path:
+        with open(path, "w", encoding="utf-8") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+    else:
+        sys.stdout.write(json.dumps(summary) + "\n")
+        sys.stdout.flush()
+
+
+def run(argv=None):
+    """Run one headless scrape and return its exit code."""
+    args = build_parser().parse_args(argv)
+    started = time.time()
+    try:
+        settings = load_settings(args)
+    except (ValueError, OSError, ImportError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        write_summary({"status": "error", "error": str(e), "exit_code": EXIT_USAGE}, args.summary)
+        return EXIT_USAGE
+
+    config = load_config()
+    config.backend = settings.get("backend") or config.backend
+    config.workers = int(settings.get("workers") or config.workers)
+    config.cache_refresh = bool(settings.get("refresh_cache")) or config.cache_refresh
+    user_inputs = {
+        "input_filename": settings["input"],
+        "sheet_name": settings["sheet"],
+        "website_url": settings.get("website_url") or config.website_url,
+        "output_filename": settings["output"],
+        "providers": settings["providers"],
+    }
+
+    # SIGINT / SIGTERM stop the run cleanly at its next checkpoint
+    control = RunControl()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: control.cancel())
+
+    import scrape_run
+    try:
+        # Progress output goes to stderr so standard output holds only the JSON summary
+        with contextlib.redirect_stdout(sys.stderr):
+            summary = scrape_run.run_scrape(user_inputs, config, control=control,
+                                            resume=bool(settings.get("resume")), diff=bool(settings.get("diff")),
+                                            update_input=settings.get("update_input") or False)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        summary = {"status": "error", "error": str(e) or type(e).__name__}
+        exit_code = EXIT_FAILED
+    else:
+        if summary["status"] == "cancelled":
+            exit_code = EXIT_CANCELLED
+        else:
+            exit_code = EXIT_LOOKUP_ERRORS if summary["failures"] else EXIT_OK
+
+    summary["exit_code"] = exit_code
+    summary["started_at"] = time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(started))
+    write_summary(summary, settings.get("summary"))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,64 @@
+import os
+import threading
+
+# Values of boolean settings that switch a feature on
+TRUE_VALUES = ("1", "true", "yes")
+
+# Document checklist website used when neither the GUI nor DOCUMENT_CHECKLIST_WEBSITE gives one
+DEFAULT_WEBSITE_URL = "https://immi.homeaffairs.gov.au/visas/web-evidentiary-tool"
+
+
+class Config:
+    def __init__(self, environ=None):
+        """Read the run settings from the environment (after .env has been loaded by load_config()).
+
+        The settings every run needs are attributes. Module-specific ones (cache paths, retry
+        delays, browser options, ...) are read with get() / flag() by the module that uses them,
+        so every setting goes through this object and the same environment mapping.
+
+        Args:
+          - environ: Mapping to read the settings from (defaults to os.environ).
+        """
+        self.environ = os.environ if environ is None else environ
+        self.website_url = self.get("DOCUMENT_CHECKLIST_WEBSITE") or DEFAULT_WEBSITE_URL
+        self.backend = self.get("SCRAPER_BACKEND", "selenium").lower()
+        self.engine = self.get("SCRAPER_ENGINE", "").lower()
+        self.workers = int(self.get("SCRAPER_WORKERS", "1"))
+        self.additional_providers = [name.strip() for name in self.get("ADDITIONAL_PROVIDERS", "").split(",") if name.strip()]
+        self.cache_refresh = self.flag("RESULT_CACHE_REFRESH")
+        self.tier_dedup = self.flag("TIER_DEDUP")
+        self.provider_profiling = self.flag("PROVIDER_PROFILING")
+        self.browser_recycling = self.flag("BROWSER_RECYCLE")
+        self.trace_path = self.get("SCRAPE_TRACE_PATH", "scrape_trace.json")
+        self.results_sink = self.get("RESULTS_SINK")
+        self.evidence_details_path = self.get("EVIDENCE_DETAILS_PATH")
+        self.warmup = self.get("SCRAPER_WARMUP", "true").lower() in TRUE_VALUES
+
+    def get(self, name, default=None):
+        """Return a raw setting, or `default` if it is not set."""
+        return self.environ.get(name, default)
+
+    def flag(self, name, default=False):
+        """Return a boolean setting ('1', 'true' or 'yes' switch it on)."""
+        value = self.get(name)
+        return default if value is None else value.lower() in TRUE_VALUES
+
+
+_config = None
+_config_lock = threading.Lock()
+
+
+def load_config():
+    """Return the process-wide Config, loading .env into the environment the first time it is called.
+
+    Every module reads its settings from the returned Config instead of calling load_dotenv()
+    and os.getenv(), so the .env file is parsed once per process however many scrapers, caches
+    and journals are created.
+    """
+    global _config
+    with _config_lock:
+        if _config is None:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _config = Config()
+    return _config
@@ -0,0 +1,89 @@
+from html.parser import HTMLParser
+import hashlib
+import re
+
+# "Country risk level: 2", "Provider Assessment Level 1", "Risk rating - 3", ...
+RISK_LEVEL_PATTERN = re.compile(r"(?:([A-Za-z][A-Za-z ]*?)\s+)?(?:risk|assessment)\s+(?:level|rating)\s*[:\-]?\s*(\d+)",
+                                re.IGNORECASE)
+
+# Elements whose end closes a run of text, so their contents are not glued to the next element
+_BLOCK_TAGS = {"p", "div", "li", "h1", "h2", "h3", "h4", "h5", "h6", "tr", "td", "th", "br", "section"}
+
+
+class _EvidenceSectionParser(HTMLParser):
+    """Collects the <h3> headings and text lines of a page, or only of the element with `container_id`."""
+
+    def __init__(self, container_id=None):
+        super().__init__(convert_charrefs=True)
+        self.container_id = container_id
+        self.found_container = False
+        self.headings = []
+        self.lines = []
+        self._depth = 0 if container_id else 1  # Nesting depth inside the container (> 0 = collecting)
+        self._in_h3 = False
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if self._depth:
+            if tag not in ("br", "img", "input", "hr", "meta", "link"):
+                self._depth += 1
+        elif self.container_id and dict(attrs).get("id") == self.container_id:
+            self.found_container = True
+            self._depth = 1
+            return
+        if self._depth and tag in _BLOCK_TAGS:
+            self._flush()
+        if self._depth and tag == "h3":
+            self._in_h3 = True
+
+    def handle_endtag(self, tag):
+        if not self._depth:
+            return
+        if tag in _BLOCK_TAGS:
+            line = self._flush()
+            if tag == "h3" and self._in_h3:
+                self.headings.append(line)
+                self._in_h3 = False
+        if tag not in ("br", "img", "input", "hr", "meta", "link"):
+            self._depth -= 1
+            if self._depth == 0:
+                self._flush()
+
+    def handle_data(self, data):
+        if self._depth:
+            self._text.append(data)
+
+    def _flush(self):
+        line = " ".join("".join(self._text).split())
+        self._text = []
+        if line:
+            self.lines.append(line)
+        return line
+
+
+def parse_evidence(html, container_id=None):
+    """Parse an evidence section into a structured record.
+
+    Args:
+      - html: The results container's HTML, or a whole page together with `container_id`.
+      - container_id: Id of the results container inside `html`; the whole document is used
+        when it is not given or not found.
+
+    Returns a dict with 'categories' (the <h3> evidence headings), 'risk_levels'
+    ({label: level} shown on the page) and 'page_hash' (hash of the section's text).
+    """
+    parser = _EvidenceSectionParser(container_id)
+    parser.feed(html)
+    parser.close()
+    if container_id and not parser.found_container:
+        return parse_evidence(html)
+
+    risk_levels = {}
+    for line in parser.lines:
+        for label, level in RISK_LEVEL_PATTERN.findall(line):
+            risk_levels[" ".join(label.split()).lower() or "risk"] = int(level)
+    return {
+        "categories": parser.headings,
+        "risk_levels": risk_levels,
+        "page_hash": hashlib.sha1("\n".join(parser.lines).encode("utf-8")).hexdigest()[:16],
+    }
@@ -1,54 +1,173 @@
-from openpyxl import load_workbook, Workbook
-from dotenv import load_dotenv
+from xml.etree import ElementTree
+import csv
+import json
 import os
+import zipfile
+
+from config import load_config
+from result_store import ResultStore
+
+# First row holding a country name in Column A
+FIRST_COUNTRY_ROW = 3
 
 class ExcelHandler:
-    def __init__(self, filename, sheetname, uni1_name=None, uni2_name=None):
-        """Initialize the Excel handler by loading the workbook and extracting country names."""
-        load_dotenv()
+    def __init__(self, filename, sheetname, uni1_name=None, uni2_name=None, providers=None):
+        """Initialize the Excel handler by loading the workbook and extracting country names.
+
+        Results are kept for every provider in `providers`; without it the two universities
+        (UNI1 and UNI2) are used. Provider results are exported in that order.
+        """
+        config = load_config()
         # Use provided university names or fallback to environment variables
-        self.uni1 = uni1_name if uni1_name else os.getenv("UNI1")
-        self.uni2 = uni2_name if uni2_name else os.getenv("UNI2")
+        self.uni1 = uni1_name if uni1_name else config.get("UNI1")
+        self.uni2 = uni2_name if uni2_name else config.get("UNI2")
+        self.providers = list(providers) if providers else [self.uni1, self.uni2]
         
         self.filename = filename
-        self.wb = load_workbook(filename=self.filename)
-        self.sheet = self.wb[sheetname]
+        self.sheetname = sheetname
 
-        # Read country names from Column A (Rows 3 to 238)
-        self.countries = [self.sheet[f"A{row}"].value for row in range(3, 238)]
+        # Stream country names from Column A (row 3 to the last used row), skipping blank rows
+        self.country_rows = self.read_countries(self.filename, self.sheetname)
+        self.countries = list(self.country_rows)
         
-        # Initialize nested dictionary with default values using UNI1 and UNI2 keys
-        self.country_data = {country: {self.uni1: "N", self.uni2: "N"} for country in self.countries}
+        # Compact country x provider result matrix; pairs without a result are written as "N"
+        self.results = ResultStore(self.countries, self.providers)
+
+    @property
+    def country_data(self):
+        """The results as {country: {provider: value}}, built from the result store on each access."""
+        return self.results.to_dict(default="N")
+
+    @staticmethod
+    def read_countries(filename, sheetname):
+        """Read Column A of a sheet in read-only mode and return {country: [row numbers]}, skipping blanks.
+
+        A country listed more than once keeps every row it appears on, so each copy is updated.
+        """
+        from openpyxl import load_workbook  # Loaded on first use to keep startup light
+        wb = load_workbook(filename=filename, read_only=True, data_only=True)
+        try:
+            rows = wb[sheetname].iter_rows(min_row=FIRST_COUNTRY_ROW, max_col=1, values_only=True)
+            country_rows = {}
+            for row, (value,) in enumerate(rows, start=FIRST_COUNTRY_ROW):
+                if value is None or not str(value).strip():
+                    continue
+                country_rows.setdefault(str(value).strip(), []).append(row)
+            return country_rows
+        finally:
+            wb.close()
+
+    @staticmethod
+    def get_sheet_names(filename):
+        """Return the sheet names of a workbook without parsing any cell data."""
+        try:
+            # Sheet names live in xl/workbook.xml, so there is no need to open the worksheets
+            with zipfile.ZipFile(filename) as archive:
+                root = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+            return [sheet.get("name") for sheet in root.iter() if sheet.tag.endswith("}sheet")]
+        except (zipfile.BadZipFile, KeyError, ElementTree.ParseError):
+            from openpyxl import load_workbook
+            wb = load_workbook(filename=filename, read_only=True)
+            try:
+                return wb.sheetnames
+            finally:
+                wb.close()
 
     def update_country_data(self, country, uni1_value, uni2_value):
         """Update the UNI1 and UNI2 values for a specific country."""
-        if country in self.country_data:
-            self.country_data[country][self.uni1] = uni1_value
-            self.country_data[country][self.uni2] = uni2_value
+        if (country, self.uni1) in self.results and (country, self.uni2) in self.results:
+            self.results.set(country, self.uni1, uni1_value)
+            self.results.set(country, self.uni2, uni2_value)
         else:
             print(f"Warning: {country} not found in Excel list!")
 
-    def save_to_excel(self):
-        """Write updated UNI1 and UNI2 values back to the original Excel file and save."""
-        for i, country in enumerate(self.countries, start=3):  # Row 3 to 238
-            self.sheet[f"B{i}"] = self.country_data[country][self.uni1]
-            self.sheet[f"C{i}"] = self.country_data[country][self.uni2]
+    def set_provider_value(self, country, provider, value, details=None):
+        """Update the value (and optionally the evidence record) for a single provider of a specific country."""
+        if (country, provider) in self.results:
+            self.results.set(country, provider, value, details)
+        else:
+            print(f"Warning: {country} / {provider} not found in Excel list!")
+
+    def save_to_excel(self, all_providers=False):
+        """Write updated provider values back to the original Excel file and save.
+
+        Only the first two providers are written, to columns B and C as before. With
+        `all_providers`, further providers go to columns D, E, ... and their names are written
+        to the header row above the first country. Only the result cells are touched, in a
+        single pass over the remembered country rows.
+        """
+        from openpyxl import load_workbook
+        from openpyxl.utils import get_column_letter
+        wb = load_workbook(filename=self.filename)
+        sheet = wb[self.sheetname]
+        columns = len(self.results.providers) if all_providers else min(len(self.results.providers), 2)
+        for column, provider in enumerate(self.results.providers[2:columns], start=4):
+            sheet[f"{get_column_letter(column)}{FIRST_COUNTRY_ROW - 1}"] = provider
+        for country, values in self.results.rows(default="N"):
+            for row in self.country_rows[country]:
+                for column, value in enumerate(values[:columns], start=2):
+                    sheet[f"{get_column_letter(column)}{row}"] = value
 
-        self.wb.save(self.filename)
+        wb.save(self.filename)
         print(f"Updated data saved to {self.filename}")
 
-    def export_to_excel(self, output_filename="country.xlsx"):
-        """Exports the country data dictionary to a new Excel file."""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Country Data"
+    def iter_result_rows(self):
+        """Yield the header row and then one [country, provider values...] row per country."""
+        yield ["Country"] + self.results.providers
+        for country, values in self.results.rows(default="N"):
+            yield [country] + values
 
-        # Write headers using UNI1 and UNI2 from .env
-        ws.append(["Country", self.uni1, self.uni2])
+    def export_to_excel(self, output_filename="country.xlsx"):
+        """Exports the country data dictionary to a new Excel file, streaming rows in write-only mode."""
+        from openpyxl import Workbook
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Country Data")
 
-        # Write data
-        for country, values in self.country_data.items():
-            ws.append([country, values[self.uni1], values[self.uni2]])
+        # Write headers using the provider names, then the data
+        for row in self.iter_result_rows():
+            ws.append(row)
 
         wb.save(output_filename)
         print(f"Data successfully exported to {output_filename}")
+
+    def export_results(self, output_filename):
+        """Exports the country data to a CSV (.csv), JSON Lines (.jsonl) or Parquet (.parquet) file."""
+        extension = os.path.splitext(output_filename)[1].lower()
+        rows = self.iter_result_rows()
+        header = next(rows)
+
+        if extension == ".csv":
+            with open(output_filename, "w", newline="", encoding="utf-8") as output:
+                writer = csv.writer(output)
+                writer.writerow(header)
+                writer.writerows(rows)
+        elif extension in (".jsonl", ".ndjson"):
+            with open(output_filename, "w", encoding="utf-8") as output:
+                for row in rows:
+                    output.write(json.dumps(dict(zip(header, row))) + "\n")
+        elif extension == ".parquet":
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Parquet export requires pyarrow (pip install pyarrow).")
+            columns = list(zip(*rows)) or [()] * len(header)
+            table = pa.table({name: list(values) for name, values in zip(header, columns)})
+            pq.write_table(table, output_filename)
+        else:
+            raise ValueError(f"Unsupported results format '{extension}'. Use .csv, .jsonl or .parquet.")
+
+        print(f"Data successfully exported to {output_filename}")
+
+    def export_evidence(self, output_filename):
+        """Exports the evidence record behind every result to a JSON Lines file, one line per (country, provider)."""
+        with open(output_filename, "w", encoding="utf-8") as output:
+            for country, values in self.results.rows():
+                for provider, value in zip(self.results.providers, values):
+                    if value is None:
+                        continue
+                    record = {"country": country, "provider": provider, "value": value}
+                    record.update(self.results.get_details(country, provider) or {})
+                    output.write(json.dumps(record) + "\n")
+
+        print(f"Evidence details exported to {output_filename}")
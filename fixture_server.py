@@ -0,0 +1,240 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from html import escape
+from urllib.parse import parse_qs
+import threading
+import time
+
+# Country and provider risk levels used by the stand-in evidentiary tool (1 = lowest risk)
+DEFAULT_COUNTRIES = {
+    "Afghanistan": 3, "Argentina": 2, "Bangladesh": 3, "Brazil": 2, "Canada": 1,
+    "China": 2, "Colombia": 3, "France": 1, "Germany": 1, "India": 3,
+    "Indonesia": 2, "Japan": 1, "Kenya": 3, "Korea, South": 1, "Malaysia": 2,
+    "Nepal": 3, "Nigeria": 3, "Pakistan": 3, "Philippines": 2, "Sri Lanka": 3,
+    "Thailand": 2, "United Kingdom": 1, "United States of America": 1, "Vietnam": 2,
+}
+DEFAULT_PROVIDERS = {
+    "University of Newcastle": 1,
+    "Peach University": 2,
+    "Example Institute of Technology": 3,
+}
+
+# Minimal stand-in for the select2 widget: same element ids and classes the WebScraper waits on
+# (select2-<id>-container, .select2-search__field, select2-<id>-results, loading-results, "No results found")
+SELECT2_SCRIPT = """
+<script>
+(function () {
+  var searchDelay = %(search_delay)d;
+  function close() {
+    var open = document.querySelector(".select2-dropdown");
+    if (open) { open.parentNode.removeChild(open); }
+  }
+  function choose(select, container, value, text) {
+    select.value = value;
+    container.textContent = text;
+    container.title = text;
+    close();
+  }
+  Array.prototype.forEach.call(document.querySelectorAll("select"), function (select) {
+    select.style.display = "none";
+    var container = document.createElement("span");
+    container.id = "select2-" + select.id + "-container";
+    container.className = "select2-selection__rendered";
+    container.textContent = select.options[select.selectedIndex].text;
+    select.parentNode.insertBefore(container, select.nextSibling);
+    select.addEventListener("change", function () {
+      container.textContent = select.options[select.selectedIndex].text;
+    });
+    container.addEventListener("click", function () {
+      close();
+      var dropdown = document.createElement("span");
+      dropdown.className = "select2-dropdown";
+      var search = document.createElement("input");
+      search.className = "select2-search__field";
+      var results = document.createElement("ul");
+      results.id = "select2-" + select.id + "-results";
+      dropdown.appendChild(search);
+      dropdown.appendChild(results);
+      container.parentNode.insertBefore(dropdown, container.nextSibling);
+      var pending = null;
+      function render(term) {
+        results.innerHTML = "";
+        var matches = Array.prototype.filter.call(select.options, function (option) {
+          return option.value && option.text.toLowerCase().indexOf(term.toLowerCase()) !== -1;
+        });
+        if (!matches.length) {
+          results.innerHTML = '<li class="select2-results__option select2-results__message">No results found</li>';
+        }
+        matches.forEach(function (option) {
+          var li = document.createElement("li");
+          li.className = "select2-results__option";
+          li.textContent = option.text;
+          li.addEventListener("click", function () { choose(select, container, option.value, option.text); });
+          results.appendChild(li);
+        });
+      }
+      search.addEventListener("input", function () {
+        clearTimeout(pending);
+        results.innerHTML = '<li class="select2-results__option loading-results">Searching\u2026</li>';
+        pending = setTimeout(function () { render(search.value); }, searchDelay);
+      });
+      search.addEventListener("keydown", function (event) {
+        if (event.key !== "Enter") { return; }
+        event.preventDefault();
+        var first = results.querySelector("li.select2-results__option:not(.select2-results__message):not(.loading-results)");
+        if (first) { first.click(); } else { close(); }
+      });
+      render("");
+      search.focus();
+    });
+  });
+})();
+</script>
+"""
+
+
+class FixtureServer:
+    """Local stand-in for the web evidentiary tool, for running scrapers without network access.
+
+    The page carries the same form as the real tool: passport country and provider dropdowns
+    (wrapped in a select2-like widget for browser runs), the '01' radio option and the
+    btnSubmitEvidence button. Posting the form back renders the evidence headings when the
+    combined country and provider risk level is high enough.
+    """
+
+    def __init__(self, countries=None, providers=None, delay=0.0, search_delay=0.0, host="127.0.0.1", port=0):
+        """
+        Args:
+          - countries: Dict of country name -> risk level (defaults to DEFAULT_COUNTRIES).
+          - providers: Dict of provider name -> risk level (defaults to DEFAULT_PROVIDERS).
+          - delay: Seconds to wait before answering each postback.
+          - search_delay: Seconds the select2 widget shows "Searching…" before listing results.
+          - host / port: Address to listen on (port 0 picks a free port).
+        """
+        self.countries = dict(countries or DEFAULT_COUNTRIES)
+        self.providers = dict(providers or DEFAULT_PROVIDERS)
+        self.delay = delay
+        self.search_delay = search_delay
+        self.postbacks = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self):
+        """URL of the evidentiary tool page."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/visas/web-evidentiary-tool"
+
+    def evidence_required(self, country, provider):
+        """Return True if the (country, provider) combination needs additional evidence."""
+        return self.countries.get(country, 3) + self.providers.get(provider, 3) >= 4
+
+    def render_page(self, country="", provider="", submitted=False):
+        """Render the evidentiary tool page, including the evidence section after a postback."""
+        country_options = "".join(
+            f'<option value="{index}"{" selected" if name == country else ""}>{escape(name)}</option>'
+            for index, name in enumerate(self.countries, start=1)
+        )
+        provider_options = "".join(
+            f'<option value="{index}"{" selected" if name == provider else ""}>{escape(name)}</option>'
+            for index, name in enumerate(self.providers, start=1)
+        )
+        evidence = ""
+        if submitted:
+            if self.evidence_required(country, provider):
+                evidence = ("<h3>Evidence of financial capacity</h3><p>Provide evidence of funds.</p>"
+                            "<h3>Evidence of English language ability</h3><p>Provide a test result.</p>")
+            else:
+                evidence = "<h3>Identity documents</h3><p>No additional evidence required.</p>"
+            evidence += (f"<p>Country risk level: {self.countries.get(country, 3)}</p>"
+                         f"<p>Provider risk level: {self.providers.get(provider, 3)}</p>")
+        return f"""<!DOCTYPE html>
+<html><head><title>Document Checklist Tool</title></head>
+<body>
+<h1>Document Checklist Tool</h1>
+<form method="post" action="/visas/web-evidentiary-tool">
+  <input type="hidden" name="__VIEWSTATE" value="{self.postbacks}">
+  <select id="drpWebEvtCountryPassport" name="drpWebEvtCountryPassport">
+    <option value="">Select a country</option>{country_options}
+  </select>
+  <select id="drpWebEvtProvider" name="drpWebEvtProvider">
+    <option value="">Select a provider</option>{provider_options}
+  </select>
+  <input type="radio" id="01" name="rdoStudentType" value="01">
+  <label for="01">Student visa</label>
+  <input type="submit" id="btnSubmitEvidence" name="btnSubmitEvidence" value="Display Evidence">
+</form>
+<div id="evidenceResults">{evidence}</div>
+{SELECT2_SCRIPT % {"search_delay": int(self.search_delay * 1000)}}
+</body></html>"""
+
+    def _handler_class(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, so the pooled HTTP session reuses connections
+            disable_nagle_algorithm = True  # Headers and body go out without waiting on delayed ACKs
+
+            def _send_html(self, html):
+                body = html.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._send_html(fixture.render_page())
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                if fixture.delay:
+                    time.sleep(fixture.delay)
+                with fixture._lock:
+                    fixture.postbacks += 1
+                country = self._option_name(fixture.countries, form.get("drpWebEvtCountryPassport"))
+                provider = self._option_name(fixture.providers, form.get("drpWebEvtProvider"))
+                submitted = "btnSubmitEvidence" in form and form.get("rdoStudentType") == ["01"]
+                self._send_html(fixture.render_page(country, provider, submitted))
+
+            @staticmethod
+            def _option_name(options, values):
+                try:
+                    return list(options)[int(values[0]) - 1]
+                except (TypeError, ValueError, IndexError):
+                    return ""
+
+            def log_message(self, format, *args):
+                pass  # Keep scraper output readable
+
+        return Handler
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+# Example usage
+if __name__ == "__main__":
+    # Serve the fixture until interrupted, e.g. for SCRAPER_BACKEND=http runs against it
+    server = FixtureServer(port=8765).start()
+    print(f"Fixture evidentiary tool running at {server.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
@@ -7,12 +7,25 @@ except ImportError:
     print("Warning: tkinter is not available. GUI functionality will be disabled.")
 
 import os
+import threading
+import time
+import traceback
 from pathlib import Path
 
+from config import load_config
+from run_control import RunControl
+
+# Milliseconds between progress updates while a run is going
+PROGRESS_POLL_MS = 250
+
 
 class GUIHandler:
-    def __init__(self):
-        """Initialize the GUI Handler with default values."""
+    def __init__(self, on_start=None):
+        """Initialize the GUI Handler with default values.
+
+        With `on_start`, the window stays open after Start Scraping: on_start(inputs, control)
+        runs in a worker thread and the window shows its progress, with pause and cancel buttons.
+        """
         self.input_filename = ""
         self.sheet_name = ""
         self.output_filename = ""
@@ -20,6 +33,10 @@ class GUIHandler:
         self.uni1_name = ""
         self.uni2_name = ""
         self.user_confirmed = False
+        self.on_start = on_start
+        self.control = None  # RunControl of the run in progress
+        self.worker = None
+        self.close_when_done = False
         
         if not TKINTER_AVAILABLE:
             raise ImportError("tkinter is not available. Cannot create GUI.")
@@ -28,14 +45,14 @@ class GUIHandler:
             # Create the main window
             self.root = tk.Tk()
             self.root.title("Country Risk Scraper - Configuration")
-            self.root.geometry("700x500")
+            self.root.geometry("700x640")
             self.root.resizable(True, True)
             
             # Variables for form inputs
             self.input_file_var = tk.StringVar()
             self.sheet_name_var = tk.StringVar()
             self.output_file_var = tk.StringVar(value="country.xlsx")
-            self.website_url_var = tk.StringVar(value="https://immi.homeaffairs.gov.au/visas/web-evidentiary-tool")
+            self.website_url_var = tk.StringVar(value=load_config().website_url)
             self.uni1_var = tk.StringVar()
             self.uni2_var = tk.StringVar()
             
@@ -141,18 +158,37 @@ class GUIHandler:
         button_frame = ttk.Frame(main_frame)
         button_frame.grid(row=11, column=0, columnspan=3, pady=(20, 0))
         
-        ttk.Button(button_frame, text="Start Scraping", 
-                  command=self.start_scraping, 
-                  style="Accent.TButton").pack(side=tk.LEFT, padx=(0, 10))
+        self.start_button = ttk.Button(button_frame, text="Start Scraping", 
+                                       command=self.start_scraping, 
+                                       style="Accent.TButton")
+        self.start_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # Shown once a run is going
+        self.pause_button = ttk.Button(button_frame, text="Pause", command=self.toggle_pause)
         
-        ttk.Button(button_frame, text="Cancel", 
-                  command=self.cancel).pack(side=tk.LEFT)
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", 
+                                        command=self.cancel)
+        self.cancel_button.pack(side=tk.LEFT)
         
         # Status label
         self.status_label = ttk.Label(main_frame, text="Please configure the settings above", 
                                      foreground="blue")
         self.status_label.grid(row=12, column=0, columnspan=3, pady=(20, 0))
         
+        # Progress section (initially hidden)
+        self.progress_frame = ttk.Frame(main_frame)
+        self.progress_frame.columnconfigure(0, weight=1)
+        self.progress_bar = ttk.Progressbar(self.progress_frame, mode="determinate")
+        self.progress_bar.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
+        self.progress_label = ttk.Label(self.progress_frame, text="")
+        self.progress_label.grid(row=1, column=0, sticky=tk.W)
+        self.rate_label = ttk.Label(self.progress_frame, text="")
+        self.rate_label.grid(row=2, column=0, sticky=tk.W)
+        self.latency_label = ttk.Label(self.progress_frame, text="", justify=tk.LEFT)
+        self.latency_label.grid(row=3, column=0, sticky=tk.W, pady=(5, 0))
+        
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
     def browse_input_file(self):
         """Open file dialog to select input Excel file."""
         filename = filedialog.askopenfilename(
@@ -182,10 +218,8 @@ class GUIHandler:
             return
         
         try:
-            from openpyxl import load_workbook
-            wb = load_workbook(filename=self.input_file_var.get())
-            sheet_names = wb.sheetnames
-            wb.close()
+            from excel_handler import ExcelHandler
+            sheet_names = ExcelHandler.get_sheet_names(self.input_file_var.get())
             
             if sheet_names:
                 # Show combobox with available sheets
@@ -274,13 +308,125 @@ class GUIHandler:
             
             self.status_label.config(text="Configuration confirmed! Starting scraper...", 
                                    foreground="green")
-            self.root.quit()  # Exit the GUI event loop
+            if self.on_start:
+                self.begin_run()
+            else:
+                self.root.quit()  # Exit the GUI event loop
     
     def cancel(self):
-        """Cancel the operation and close the GUI."""
-        self.user_confirmed = False
+        """Cancel the run in progress, or the operation if no run has started, and close the GUI."""
+        if self.worker and self.worker.is_alive():
+            self.control.cancel()
+            self.pause_button.config(state="disabled")
+            self.cancel_button.config(state="disabled")
+            self.status_label.config(text="Cancelling after the current lookups...", foreground="orange")
+            return
+        if not self.worker:
+            self.user_confirmed = False
         self.root.quit()
     
+    def on_close(self):
+        """Window close button: cancel a running scrape first and close once it has stopped."""
+        if self.worker and self.worker.is_alive():
+            self.close_when_done = True
+        self.cancel()
+    
+    def begin_run(self):
+        """Lock the form, show the progress section and start the scrape in a worker thread."""
+        for entry in (self.input_file_entry, self.sheet_name_entry, self.sheet_combo, self.website_entry,
+                      self.uni1_entry, self.uni2_entry, self.output_file_entry):
+            entry.config(state="disabled")
+        self.start_button.config(state="disabled")
+        self.pause_button.pack(side=tk.LEFT, padx=(0, 10), before=self.cancel_button)
+        self.progress_frame.grid(row=13, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(15, 0))
+        self.progress_label.config(text="Starting browser and loading the website...")
+        
+        inputs = self.collect_inputs()
+        self.control = RunControl()
+        self.progress = {"total": 0, "per_country": 1, "started": time.time(), "done": set(), "countries": {}}
+        self.worker = threading.Thread(target=self.run_worker, args=(inputs,), daemon=True)
+        self.worker.start()
+        self.root.after(PROGRESS_POLL_MS, self.poll_progress)
+    
+    def run_worker(self, inputs):
+        """Worker thread: run the scrape and report how it ended (never touches tkinter)."""
+        try:
+            completed = self.on_start(inputs, self.control)
+            self.control.finish(None if completed is not False else "cancelled")
+        except Exception as e:
+            traceback.print_exc()
+            self.control.finish(str(e) or type(e).__name__)
+    
+    def toggle_pause(self):
+        """Pause the run at its next checkpoint, or let a paused run continue."""
+        if self.control.paused:
+            self.control.resume()
+            self.pause_button.config(text="Pause")
+            self.status_label.config(text="Scraping...", foreground="green")
+        else:
+            self.control.pause()
+            self.pause_button.config(text="Resume")
+            self.status_label.config(text="Paused after the current lookups", foreground="orange")
+    
+    def poll_progress(self):
+        """Apply the progress events sent by the worker and refresh the progress section."""
+        finished = None
+        while not self.control.events.empty():
+            event = self.control.events.get_nowait()
+            if event[0] == "begin":
+                self.progress.update(total=event[1], per_country=max(1, event[2]), started=event[3])
+                self.progress_bar.config(maximum=max(1, event[1]))
+            elif event[0] == "result":
+                _, country, provider, value, _ = event
+                if (country, provider) not in self.progress["done"]:
+                    self.progress["done"].add((country, provider))
+                    self.progress["countries"][country] = self.progress["countries"].get(country, 0) + 1
+            elif event[0] == "done":
+                finished = event
+        
+        done, total = len(self.progress["done"]), self.progress["total"]
+        if total:
+            countries_done = sum(count >= self.progress["per_country"] for count in self.progress["countries"].values())
+            elapsed = max(time.time() - self.progress["started"], 1e-6)
+            eta = (total - done) * elapsed / done if done else None
+            self.progress_bar.config(value=done)
+            self.progress_label.config(text=f"{done}/{total} lookups, {countries_done} countries complete")
+            self.rate_label.config(text=f"{countries_done / elapsed * 60:.1f} countries/minute, ETA "
+                                        + (time.strftime('%H:%M:%S', time.gmtime(eta)) if eta is not None else "--"))
+        latest = self.control.metrics.latest.copy() if self.control.metrics else {}
+        if latest:
+            self.latency_label.config(text="Latest step latencies:\n" + "\n".join(
+                f"  {step}: {seconds:.2f}s" for step, seconds in latest.items()))
+        
+        if finished is None:
+            self.root.after(PROGRESS_POLL_MS, self.poll_progress)
+            return
+        self.finish_run(finished[1])
+    
+    def finish_run(self, error):
+        """Show how the run ended and turn Cancel into Close."""
+        self.pause_button.pack_forget()
+        self.cancel_button.config(text="Close", state="normal")
+        if error is None:
+            self.status_label.config(text="Scraping completed successfully!", foreground="green")
+        elif error == "cancelled":
+            self.status_label.config(text="Run cancelled. Start again with --resume to continue.", foreground="orange")
+        else:
+            self.status_label.config(text=f"Scraping failed: {error}", foreground="red")
+        if self.close_when_done:
+            self.root.quit()
+    
+    def collect_inputs(self):
+        """Return the confirmed settings as the dict handed to the scraper."""
+        return {
+            'input_filename': self.input_filename,
+            'sheet_name': self.sheet_name,
+            'output_filename': self.output_filename,
+            'website_url': self.website_url,
+            'uni1_name': self.uni1_name,
+            'uni2_name': self.uni2_name
+        }
+    
     def get_user_inputs(self):
         """Show the GUI and return user inputs when confirmed."""
         # Center the window
@@ -298,30 +444,30 @@ class GUIHandler:
         self.root.destroy()
         
         if self.user_confirmed:
-            return {
-                'input_filename': self.input_filename,
-                'sheet_name': self.sheet_name,
-                'output_filename': self.output_filename,
-                'website_url': self.website_url,
-                'uni1_name': self.uni1_name,
-                'uni2_name': self.uni2_name
-            }
+            return self.collect_inputs()
         else:
             return None
     
     @staticmethod
-    def run_gui():
-        """Static method to run the GUI and get user inputs."""
-        if not TKINTER_AVAILABLE:
-            return GUIHandler.run_console_interface()
+    def run_gui(on_start=None):
+        """Static method to run the GUI and get user inputs.
         
-        try:
-            gui = GUIHandler()
-            return gui.get_user_inputs()
-        except Exception as e:
-            print(f"GUI Error: {e}")
-            print("Falling back to console interface...")
-            return GUIHandler.run_console_interface()
+        With `on_start`, the confirmed inputs are also run: in a worker thread behind the
+        progress window in GUI mode, or directly (without pause / cancel) in console mode.
+        """
+        if TKINTER_AVAILABLE:
+            try:
+                gui = GUIHandler(on_start)
+            except Exception as e:
+                print(f"GUI Error: {e}")
+                print("Falling back to console interface...")
+            else:
+                return gui.get_user_inputs()
+        
+        user_inputs = GUIHandler.run_console_interface()
+        if user_inputs and on_start:
+            on_start(user_inputs)
+        return user_inputs
     
     @staticmethod
     def run_console_interface():
@@ -345,10 +491,8 @@ class GUIHandler:
             # Get sheet name with auto-detection
             sheet_name = ""
             try:
-                from openpyxl import load_workbook
-                wb = load_workbook(filename=input_file)
-                sheet_names = wb.sheetnames
-                wb.close()
+                from excel_handler import ExcelHandler
+                sheet_names = ExcelHandler.get_sheet_names(input_file)
                 
                 if len(sheet_names) == 1:
                     sheet_name = sheet_names[0]
@@ -378,7 +522,7 @@ class GUIHandler:
                 return None
             
             # Get website URL
-            default_url = "https://immi.homeaffairs.gov.au/visas/web-evidentiary-tool"
+            default_url = load_config().website_url
             website_url = input(f"Enter document checklist website URL (or press Enter for default): ").strip()
             if not website_url:
                 website_url = default_url
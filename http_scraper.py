@@ -0,0 +1,266 @@
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import time
+
+from base_scraper import BaseScraper
+from config import load_config
+from evidence_parser import parse_evidence
+from instrumentation import timed_step
+from retry_policy import PermanentStepError, StalePageError
+
+
+class _EvidenceFormParser(HTMLParser):
+    """Collects the evidentiary form fields, dropdown options and <h3> headings from a page."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.form_action = None
+        self.fields = {}    # name -> value for hidden/text inputs
+        self.selects = {}   # select id -> {"name": name, "options": [(value, text), ...], "selected": value}
+        self.radios = {}    # input id -> (name, value)
+        self.buttons = {}   # input/button id -> (name, value)
+        self.headings = []
+        self._select_id = None
+        self._option_value = None
+        self._option_text = []
+        self._in_h3 = False
+        self._h3_text = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "form" and self.form_action is None:
+            self.form_action = attrs.get("action", "")
+        elif tag == "input":
+            input_type = (attrs.get("type") or "text").lower()
+            name = attrs.get("name")
+            if input_type == "radio":
+                self.radios[attrs.get("id")] = (name, attrs.get("value", "on"))
+            elif input_type == "submit":
+                self.buttons[attrs.get("id")] = (name, attrs.get("value", ""))
+            elif name and input_type in ("hidden", "text"):
+                self.fields[name] = attrs.get("value", "")
+        elif tag == "button" and attrs.get("id"):
+            self.buttons[attrs.get("id")] = (attrs.get("name"), attrs.get("value", ""))
+        elif tag == "select":
+            self._select_id = attrs.get("id") or attrs.get("name")
+            self.selects[self._select_id] = {"name": attrs.get("name") or self._select_id, "options": [], "selected": None}
+        elif tag == "option" and self._select_id:
+            self._option_value = attrs.get("value")
+            self._option_text = []
+            if "selected" in attrs:
+                self.selects[self._select_id]["selected"] = self._option_value
+        elif tag == "h3":
+            self._in_h3 = True
+            self._h3_text = []
+
+    def handle_endtag(self, tag):
+        if tag == "option" and self._select_id and self._option_value is not None:
+            text = " ".join("".join(self._option_text).split())
+            self.selects[self._select_id]["options"].append((self._option_value, text))
+            self._option_value = None
+        elif tag == "select":
+            self._select_id = None
+        elif tag == "h3" and self._in_h3:
+            self.headings.append(" ".join("".join(self._h3_text).split()))
+            self._in_h3 = False
+
+    def handle_data(self, data):
+        if self._option_value is not None:
+            self._option_text.append(data)
+        if self._in_h3:
+            self._h3_text.append(data)
+
+
+class HttpScraper(BaseScraper):
+    def __init__(self, website_url=None, wait_timeouts=None, pool_size=4):
+        """Initialize the HTTP scraper by loading environment variables and setting up a pooled session.
+
+        This backend never starts a browser: it reads the evidentiary form from the page,
+        fills in the same fields the select2 dropdowns would, posts the form back and
+        parses the returned HTML.
+
+        Args:
+          - website_url: Document checklist website URL (falls back to DOCUMENT_CHECKLIST_WEBSITE).
+          - wait_timeouts: Optional dict; the 'evidence' entry is used as the request timeout.
+          - pool_size: Number of keep-alive connections kept open to the site.
+        """
+        config = load_config()
+
+        BaseScraper.__init__(self)
+        self.document_checklist_website = website_url if website_url else config.get("DOCUMENT_CHECKLIST_WEBSITE")
+        # The select2 container ids wrap native <select> elements: select2-<id>-container
+        self.passport_select_id = self.native_select_id(config.get("PASSPORT_FIELD", "select2-drpWebEvtCountryPassport-container"))
+        self.provider_select_id = self.native_select_id(config.get("EDUCATION_PROVIDER_FIELD", "select2-drpWebEvtProvider-container"))
+        self.submit_button_id = "btnSubmitEvidence"
+        self.radio_id = "01"
+        self.evidence_container_id = config.get("EVIDENCE_CONTAINER_ID", "evidenceResults")
+        self.timeout = (wait_timeouts or {}).get("evidence", 15)
+
+        # One pooled keep-alive session reused for every lookup
+        self.pool_size = pool_size
+        self.session = self.new_session(pool_size)
+
+        self.form = None          # Parsed form of the current page
+        self.form_data = {}       # Field values to post back
+        self.post_url = None
+        self.last_headings = []   # <h3> headings of the last postback
+        self.last_html = ""       # HTML of the last page loaded
+
+    def _load_form(self, html, url):
+        """Parse the evidentiary form from a page and reset the post-back data to its hidden fields."""
+        form = _EvidenceFormParser()
+        form.feed(html)
+        self.form = form
+        self.form_data = dict(form.fields)
+        self.post_url = urljoin(url, form.form_action or "")
+        self.last_headings = form.headings
+        self.last_html = html
+
+    @staticmethod
+    def new_session(pool_size):
+        """Create a keep-alive session with `pool_size` pooled connections and retries on gateway errors."""
+        session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=None)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def open_website(self):
+        """Open the target website and read the evidentiary form."""
+        started = time.perf_counter()
+        response = self.session.get(self.document_checklist_website, timeout=self.timeout)
+        response.raise_for_status()
+        self.wait_log.append(("page_load", time.perf_counter() - started, False))
+        self._load_form(response.text, response.url)
+        self.current_provider = None  # A fresh page has no provider selected
+        print("Website loaded successfully.")
+
+    def _select_option(self, select_id, matches):
+        """Set a dropdown field to the first option whose text satisfies `matches`. Return the option text."""
+        select = self.form.selects.get(select_id) if self.form else None
+        if select is None:
+            raise ValueError(f"Dropdown '{select_id}' not found on the page")
+        for value, text in select["options"]:
+            if value and matches(text):
+                self.form_data[select["name"]] = value
+                return text
+        return None
+
+    def fetch_option_lists(self):
+        """Return the passport country and provider dropdown options as {"countries": [...], "providers": [...]}."""
+        if self.form is None:
+            self.open_website()
+        return {
+            "countries": self.form.selects.get(self.passport_select_id, {}).get("options", []),
+            "providers": self.form.selects.get(self.provider_select_id, {}).get("options", []),
+        }
+
+    def _select_value(self, select_id, option):
+        """Set a dropdown field directly to a resolved (value, text) option.
+
+        Return False, leaving the field alone, if the page has no option with that value and text
+        (the site renumbered or reordered its dropdown since the option index was built).
+        """
+        select = self.form.selects[select_id]
+        if tuple(option) not in {tuple(page_option) for page_option in select["options"]}:
+            return False
+        self.form_data[select["name"]] = option[0]
+        return True
+
+    @timed_step("select_country", "Error selecting country")
+    def select_country(self, country_name):
+        """Selects a country from the passport country dropdown."""
+        option = self.resolved_options["countries"].get(country_name)
+        if option:
+            if self._select_value(self.passport_select_id, option):
+                print(f"Country '{option[1]}' selected by option value.")
+                return
+            self.refresh_resolved_options()
+            country_name = option[1]  # Match the option text the name was resolved to
+
+        wanted = country_name.strip().lower()
+        text = self._select_option(self.passport_select_id, lambda option: option.lower() == wanted)
+        if text is None:
+            # Same fallback as the browser backend: match on the first four characters
+            print(f"Country '{country_name}' not found in dropdown.")
+            self.count_retry()
+            text = self._select_option(self.passport_select_id, lambda option: option.lower().startswith(wanted[:4]))
+        if text is None:
+            raise PermanentStepError("no matching option")
+        print(f"Country '{text}' selected successfully.")
+
+    @timed_step("select_education_provider", "Error selecting provider")
+    def select_education_provider(self, provider_name):
+        """Selects an education provider from the provider dropdown."""
+        option = self.resolved_options["providers"].get(provider_name)
+        if option:
+            if self._select_value(self.provider_select_id, option):
+                print(f"Selected {option[1]}.")
+                return
+            self.refresh_resolved_options()
+            provider_name = option[1]  # Match the option text the name was resolved to
+        if self._select_option(self.provider_select_id, lambda option: provider_name in option) is None:
+            raise PermanentStepError("no matching option")
+        print(f"Selected {provider_name}.")
+
+    @timed_step("select_radio_option", "Error selecting the radio button")
+    def select_radio_option(self):
+        """Selects the radio option with id '01'."""
+        name, value = self.form.radios[self.radio_id]
+        self.form_data[name] = value
+        print("Radio button selected successfully.")
+
+    @timed_step("click_display_evidence", "Error clicking the Display Evidence button")
+    def click_display_evidence(self):
+        """Posts the form back as the 'Display Evidence' button would and keeps the returned page."""
+        self.last_headings = []
+        self.last_html = ""
+        data = dict(self.form_data)
+        name, value = self.form.buttons.get(self.submit_button_id, (self.submit_button_id, ""))
+        if name:
+            data[name] = value
+        started = time.perf_counter()
+        response = self.session.post(self.post_url, data=data, timeout=self.timeout)
+        response.raise_for_status()
+        self.wait_log.append(("evidence", time.perf_counter() - started, False))
+
+        # Keep the selections but pick up any refreshed hidden fields (e.g. view state)
+        selections = {key: val for key, val in self.form_data.items() if key not in self.form.fields}
+        self._load_form(response.text, response.url)
+        self.form_data.update(selections)
+
+        # The returned page echoes the selected passport country; a different one means the
+        # response belongs to another postback (e.g. a cached or reordered page)
+        passport = self.form.selects.get(self.passport_select_id, {})
+        posted = data.get(passport.get("name"))
+        if passport.get("selected") is not None and posted and passport["selected"] != posted:
+            self.last_headings = []
+            self.last_html = ""
+            raise StalePageError(f"page shows country option {passport['selected']}, expected {posted}")
+        print("Clicked 'Display Evidence' button.")
+
+    @timed_step("check_evidence_on_page", "Error checking evidence on page")
+    def check_evidence_on_page(self):
+        """Checks if 'Evidence of financial capacity' or 'Evidence of English language ability' appears inside <h3> tags."""
+        self.last_evidence = parse_evidence(self.last_html, self.evidence_container_id)
+        self.last_fingerprint = self.fingerprint_headings(self.last_evidence["categories"])
+        if self.headings_contain_evidence(self.last_evidence["categories"]):
+            print("Evidence found on the page.")
+            return True
+        print("No evidence found on the page.")
+        return False
+
+    def close_browser(self):
+        """Close the pooled HTTP session."""
+        self.session.close()
+        print("HTTP session closed.")
+
+    def restart_browser(self):
+        """Replace the HTTP session (dropping its connections and cookies) and load the website again."""
+        self.session.close()
+        self.session = self.new_session(self.pool_size)
+        self.open_website()
@@ -0,0 +1,163 @@
+from collections import defaultdict
+from contextlib import contextmanager
+import csv
+import functools
+import json
+import threading
+import time
+
+from retry_policy import StepFailedError
+
+
+def percentile(sorted_values, pct):
+    """Return the pct-th percentile (0-100) of an already sorted list, interpolating between ranks."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def timed_step(step, error_message):
+    """Decorator for scraper steps: retries failures and records each call in the scraper's StepMetrics.
+
+    A step that raises is run again under the scraper's RetryPolicy (with backoff). Once its
+    retries are used up, the error is printed after `error_message`, recorded as a failure and
+    raised as StepFailedError so the lookup can be marked as failed rather than as "N".
+    Steps that try again internally report it with `self.count_retry()`.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            self.step_retries = 0
+            started = time.perf_counter()
+            error = None
+            attempt = 0
+            try:
+                while True:
+                    try:
+                        return method(self, *args, **kwargs)
+                    except Exception as e:
+                        policy = self.retry_policy
+                        if policy is None or not policy.should_retry(step, attempt, e):
+                            error = e
+                            break
+                        print(f"Retrying {step} after error: {e}")
+                        self.count_retry()
+                        policy.sleep(attempt)
+                        attempt += 1
+                print(f"{error_message}{' ' + str(args[0]) if args else ''}: {error}")
+                raise StepFailedError(f"{step} failed: {error}") from error
+            finally:
+                if self.metrics is not None:
+                    country, provider = self.current_lookup
+                    self.metrics.record(step, time.perf_counter() - started, country=country, provider=provider,
+                                        ok=error is None, retries=self.step_retries,
+                                        error=str(error) if error else None)
+        return wrapper
+    return decorator
+
+
+class StepMetrics:
+    def __init__(self):
+        """Initialize an empty, thread-safe trace of scraper step calls."""
+        self.calls = []  # One dict per step call
+        self.latest = {}  # step -> seconds taken by its most recent call
+        self.gauges = {}  # name -> latest reading of a sampled figure (e.g. a browser's memory)
+        self._lock = threading.Lock()
+
+    def record(self, step, seconds, country=None, provider=None, ok=True, retries=0, error=None):
+        """Record one step call."""
+        entry = {"step": step, "country": country, "provider": provider, "seconds": round(seconds, 6),
+                 "ok": ok, "retries": retries, "error": error, "time": time.time()}
+        with self._lock:
+            self.calls.append(entry)
+            self.latest[step] = entry["seconds"]
+
+    def gauge(self, name, value):
+        """Record the latest reading of a sampled figure."""
+        with self._lock:
+            self.gauges[name] = value
+
+    @contextmanager
+    def measure(self, step, country=None, provider=None):
+        """Context manager timing a block of code as a step call; an exception is recorded and re-raised."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.record(step, time.perf_counter() - started, country, provider, ok=False, error=str(e))
+            raise
+        self.record(step, time.perf_counter() - started, country, provider)
+
+    def _group_summary(self, key):
+        """Summarize call latencies grouped by `key` ('step' or 'country')."""
+        with self._lock:
+            calls = list(self.calls)
+        groups = defaultdict(list)
+        for call in calls:
+            groups[call[key]].append(call)
+
+        summary = {}
+        for name, group in groups.items():
+            seconds = sorted(call["seconds"] for call in group)
+            summary[name] = {
+                "calls": len(group),
+                "failures": sum(not call["ok"] for call in group),
+                "retries": sum(call["retries"] for call in group),
+                "total": sum(seconds),
+                "p50": percentile(seconds, 50),
+                "p90": percentile(seconds, 90),
+                "p99": percentile(seconds, 99),
+                "max": seconds[-1],
+            }
+        return summary
+
+    def step_summary(self):
+        """Return latency percentiles, failures and retries per step."""
+        return self._group_summary("step")
+
+    def country_summary(self):
+        """Return latency percentiles, failures and retries per country (all steps of its lookups)."""
+        return self._group_summary("country")
+
+    def print_report(self, slowest_countries=10):
+        """Print per-step percentiles and the countries that took longest."""
+        print("\nStep timings (seconds):")
+        print(f"  {'step':<26}{'calls':>7}{'fail':>6}{'retry':>7}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+        for step, entry in self.step_summary().items():
+            print(f"  {step:<26}{entry['calls']:>7}{entry['failures']:>6}{entry['retries']:>7}"
+                  f"{entry['p50']:>9.3f}{entry['p90']:>9.3f}{entry['p99']:>9.3f}{entry['max']:>9.3f}")
+
+        with self._lock:
+            gauges = dict(self.gauges)
+        if gauges:
+            print("\nGauges (latest readings):")
+            for name, value in sorted(gauges.items()):
+                print(f"  {name:<40}{value}")
+
+        countries = sorted(((country, entry) for country, entry in self.country_summary().items() if country),
+                           key=lambda item: item[1]["total"], reverse=True)
+        if countries:
+            print(f"\nSlowest countries (total seconds over {len(countries)} countries):")
+            for country, entry in countries[:slowest_countries]:
+                print(f"  {country:<32}{entry['total']:>9.3f}  calls={entry['calls']} "
+                      f"failures={entry['failures']} retries={entry['retries']}")
+
+    def write_trace(self, path):
+        """Write every recorded call to a .json (with summaries) or .csv trace file."""
+        with self._lock:
+            calls = list(self.calls)
+            gauges = dict(self.gauges)
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="", encoding="utf-8") as trace:
+                writer = csv.DictWriter(trace, fieldnames=["time", "step", "country", "provider",
+                                                           "seconds", "ok", "retries", "error"])
+                writer.writeheader()
+                writer.writerows(calls)
+        else:
+            with open(path, "w", encoding="utf-8") as trace:
+                json.dump({"steps": self.step_summary(), "countries": self.country_summary(), "gauges": gauges,
+                           "calls": calls}, trace, indent=2)
+        print(f"Step trace written to {path}")
@@ -0,0 +1,180 @@
+import difflib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+
+from config import load_config
+
+# Common spreadsheet spellings and the names the evidentiary tool is likely to use for them.
+# Keys and values are compared after normalise(); a value may list several candidates.
+BUILTIN_ALIASES = {
+    "usa": ["united states of america"],
+    "us": ["united states of america"],
+    "united states": ["united states of america"],
+    "uk": ["united kingdom"],
+    "great britain": ["united kingdom"],
+    "south korea": ["korea south", "korea republic of", "republic of korea"],
+    "north korea": ["korea north", "korea democratic peoples republic of"],
+    "vietnam": ["viet nam"],
+    "viet nam": ["vietnam"],
+    "russia": ["russian federation"],
+    "laos": ["lao peoples democratic republic", "laos"],
+    "burma": ["myanmar"],
+    "ivory coast": ["cote divoire"],
+    "czechia": ["czech republic"],
+    "czech republic": ["czechia"],
+    "turkey": ["turkiye"],
+    "turkiye": ["turkey"],
+    "hong kong": ["hong kong sar of china", "hong kong sar", "china hong kong sar"],
+    "macau": ["macau sar of china", "macao sar of china", "macao"],
+    "macao": ["macau sar of china", "macao sar of china", "macau"],
+    "taiwan": ["taiwan province of china", "taiwan republic of china"],
+    "iran": ["iran islamic republic of"],
+    "syria": ["syrian arab republic"],
+    "palestine": ["palestinian authority", "palestine state of"],
+    "east timor": ["timor leste"],
+    "swaziland": ["eswatini"],
+    "cape verde": ["cabo verde"],
+    "macedonia": ["north macedonia"],
+    "congo": ["congo republic of", "congo"],
+    "drc": ["congo democratic republic of"],
+}
+
+OPTION_KINDS = ("countries", "providers")
+
+
+def normalise(name):
+    """Reduce a name to a comparable form: no accents, case, punctuation, 'the' prefix or extra spaces."""
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii")
+    text = text.casefold().replace("&", " and ")
+    text = re.sub(r"[^a-z0-9 ]+", " ", text.replace("'", ""))
+    text = " ".join(text.split())
+    return text[4:] if text.startswith("the ") else text
+
+
+class NameResolver:
+    def __init__(self, index_path=None, aliases_path=None, max_age_days=None, force_refresh=False, website_url=None):
+        """Initialize the resolver mapping spreadsheet names onto the tool's dropdown options.
+
+        Args:
+          - index_path: JSON file caching the site's option lists (falls back to NAME_INDEX_PATH, then name_index.json).
+            The file keeps one entry per website, so option values read from the local fixture or
+            another site are never used against the live website.
+          - aliases_path: Optional JSON file of {"spreadsheet name": "site option text"} (falls back to NAME_ALIASES_PATH).
+          - max_age_days: Re-read the option lists from the site after this many days (NAME_INDEX_MAX_AGE_DAYS, default 30).
+          - force_refresh: Ignore the cached index and read the option lists from the site.
+          - website_url: Website the option lists belong to (falls back to DOCUMENT_CHECKLIST_WEBSITE).
+        """
+        config = load_config()
+        self.website_url = website_url or config.website_url
+        self.index_path = index_path or config.get("NAME_INDEX_PATH", "name_index.json")
+        self.aliases_path = aliases_path or config.get("NAME_ALIASES_PATH")
+        self.max_age_seconds = float(max_age_days if max_age_days is not None
+                                     else config.get("NAME_INDEX_MAX_AGE_DAYS", "30")) * 86400
+        self.force_refresh = force_refresh
+        self.options = {kind: [] for kind in OPTION_KINDS}  # kind -> [(value, text), ...]
+        self._by_name = {kind: {} for kind in OPTION_KINDS}  # kind -> {normalised text: (value, text)}
+        self._lock = threading.Lock()  # Pooled scrapers may rebuild the index at the same time
+
+        self.aliases = {alias: list(targets) for alias, targets in BUILTIN_ALIASES.items()}
+        if self.aliases_path and os.path.exists(self.aliases_path):
+            with open(self.aliases_path, encoding="utf-8") as aliases_file:
+                for alias, target in json.load(aliases_file).items():
+                    self.aliases[normalise(alias)] = [normalise(target)]
+
+    def load_or_build(self, fetch_option_lists):
+        """Load the website's option index from disk, or call fetch_option_lists() and cache its result.
+
+        fetch_option_lists must return {"countries": [(value, text), ...], "providers": [...]}.
+        """
+        with self._lock:
+            index = None if self.force_refresh else self._read_index()
+            if index is None:
+                index = self._build(fetch_option_lists)
+            self._use(index)
+        return self
+
+    def rebuild(self, fetch_option_lists):
+        """Re-read the option lists from the site, e.g. after it renumbered a dropdown, and cache them."""
+        with self._lock:
+            self._use(self._build(fetch_option_lists))
+        return self
+
+    def _read_index(self):
+        """Return this website's cached index, or None if it is missing or too old."""
+        if not os.path.exists(self.index_path):
+            return None
+        with open(self.index_path, encoding="utf-8") as index_file:
+            index = json.load(index_file).get(self.website_url)
+        if index is None or time.time() - index.get("fetched_at", 0) > self.max_age_seconds:
+            return None
+        return index
+
+    def _build(self, fetch_option_lists):
+        """Fetch the option lists and store them under this website, keeping other websites' entries."""
+        options = fetch_option_lists()
+        index = {"fetched_at": time.time(), **{kind: [list(option) for option in options[kind]] for kind in OPTION_KINDS}}
+        sites = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as index_file:
+                sites = json.load(index_file)
+            if "fetched_at" in sites:  # Index written before it was keyed by website
+                sites = {}
+        sites[self.website_url] = index
+        with open(self.index_path, "w", encoding="utf-8") as index_file:
+            json.dump(sites, index_file, indent=1)
+        print(f"Dropdown option index for {self.website_url} saved to {self.index_path}")
+        return index
+
+    def _use(self, index):
+        for kind in OPTION_KINDS:
+            self.options[kind] = [tuple(option) for option in index.get(kind, []) if option[0]]
+            self._by_name[kind] = {normalise(text): (value, text) for value, text in self.options[kind]}
+
+    def resolve(self, name, kind="countries"):
+        """Return ((value, text), method) for a spreadsheet name, or (None, None) if nothing matches.
+
+        Methods, tried in order: 'exact', 'alias', 'fuzzy'.
+        """
+        by_name = self._by_name[kind]
+        key = normalise(name)
+        if key in by_name:
+            return by_name[key], "exact"
+
+        for target in self.aliases.get(key, []):
+            if target in by_name:
+                return by_name[target], "alias"
+
+        # A provider name usually appears inside the option text (e.g. with its CRICOS code)
+        if kind == "providers":
+            containing = [option_key for option_key in by_name if key and key in option_key]
+            if len(containing) == 1:
+                return by_name[containing[0]], "fuzzy"
+
+        close = difflib.get_close_matches(key, list(by_name), n=1, cutoff=0.85)
+        if close:
+            return by_name[close[0]], "fuzzy"
+        return None, None
+
+    def resolve_all(self, names, kind="countries", report=True):
+        """Resolve every name and return {name: (value, text)}; optionally print fuzzy and unresolved names."""
+        resolved, fuzzy, unresolved = {}, [], []
+        for name in names:
+            option, method = self.resolve(name, kind)
+            if option is None:
+                unresolved.append(name)
+                continue
+            resolved[name] = option
+            if method == "fuzzy":
+                fuzzy.append((name, option[1]))
+
+        if report:
+            print(f"Resolved {len(resolved)}/{len(names)} {kind} against the website's dropdown.")
+            for name, text in fuzzy:
+                print(f"  Fuzzy match: '{name}' -> '{text}'")
+            for name in unresolved:
+                print(f"  Not found on the website: '{name}' (add it to NAME_ALIASES_PATH)")
+        return resolved
@@ -0,0 +1,206 @@
+import json
+import os
+import threading
+
+from config import load_config
+
+# Results that say something about a provider's tier; errors and unknown cells are ignored
+PROFILE_VALUES = ("Y", "N")
+
+
+class ProviderProfiler:
+    def __init__(self, tiers=None, path=None, max_samples=None, verify_samples=None):
+        """Initialize the stage that places a provider in a known provider tier from a few sample lookups.
+
+        The outcome of a lookup depends on the country's and the provider's risk ratings, so every
+        provider with the same rating has the same result for every country. The profiler keeps a
+        local tier x country matrix: one {country: 'Y'/'N'} column per provider tier seen in earlier
+        runs. A provider is profiled by looking up the countries that best tell the remaining tiers
+        apart; once a single tier fits, `verify_samples` more countries are checked against it. If
+        they agree, the rest of the provider's countries are answered from that tier's column;
+        otherwise (or with no tiers to compare against) the provider is looked up in full and
+        becomes a new tier when learn() is called.
+
+        Args:
+          - tiers: Dict of tier label -> {country: 'Y'/'N'}; without it the matrix is read from `path`.
+          - path: JSON file holding the matrix (falls back to PROVIDER_PROFILES_PATH, then
+            provider_profiles.json). save() writes the updated matrix back to it.
+          - max_samples: Live lookups allowed per provider before giving up (PROVIDER_MAX_SAMPLES, default 8).
+          - verify_samples: Extra lookups confirming the matched tier (PROVIDER_VERIFY_SAMPLES, default 2).
+        """
+        config = load_config()
+        self.path = path or config.get("PROVIDER_PROFILES_PATH", "provider_profiles.json")
+        self.max_samples = int(max_samples or config.get("PROVIDER_MAX_SAMPLES", "8"))
+        self.verify_samples = int(verify_samples if verify_samples is not None else config.get("PROVIDER_VERIFY_SAMPLES", "2"))
+        self.tiers, self.providers = self.load(self.path) if tiers is None else (
+            {label: dict(column) for label, column in tiers.items()}, {})
+        self.assigned = {}  # provider -> tier label answering the rest of this run's lookups
+        self.stats = {"profiled": 0, "matched": 0, "samples": 0, "answered": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load(path):
+        """Read ({tier: {country: value}}, {provider: tier}) from the profiles file; an absent file gives empty tables."""
+        if not os.path.exists(path):
+            return {}, {}
+        with open(path, encoding="utf-8") as profiles_file:
+            profiles = json.load(profiles_file)
+        return profiles.get("tiers", {}), profiles.get("providers", {})
+
+    def profile(self, provider, countries, sample):
+        """Find the tier of `provider` by sampling some of `countries`.
+
+        Args:
+          - provider: Provider to profile.
+          - countries: The run's countries; samples are drawn from them.
+          - sample: Callable taking a country and returning the provider's live result for it.
+
+        Returns the matched tier label, or None if the provider has to be looked up in full.
+        """
+        self.stats["profiled"] += 1
+        candidates = {label: column for label, column in self.tiers.items()
+                      if any(country in column for country in countries)}
+        if not candidates:
+            return None
+
+        sampled = {}
+        confirmations = 0  # Samples agreeing with the last remaining tier
+        while len(sampled) < self.max_samples:
+            if len(candidates) == 1 and self._verified(candidates, countries, sampled, confirmations):
+                break
+            country = self._next_sample(candidates, countries, sampled)
+            if country is None:
+                break
+            value = sample(country)
+            self.stats["samples"] += 1
+            sampled[country] = value
+            if value not in PROFILE_VALUES:
+                continue
+            matching = {label: column for label, column in candidates.items() if column.get(country) == value}
+            if len(candidates) == 1 and matching:
+                confirmations += 1
+            candidates = matching
+            if not candidates:
+                break
+
+        if len(candidates) != 1 or not self._verified(candidates, countries, sampled, confirmations):
+            print(f"Provider {provider}: no consistent tier after {len(sampled)} sample lookups; checking every country.")
+            return None
+        label = next(iter(candidates))
+        with self._lock:
+            self.assigned[provider] = label
+            self.providers[provider] = label
+        self.stats["matched"] += 1
+        print(f"Provider {provider} matches provider tier '{label}' after {len(sampled)} sample lookups.")
+        return label
+
+    def profile_run(self, scraper, excel_handler, countries, providers):
+        """Profile every provider of a run before its main pass.
+
+        Samples are looked up through `scraper` like any other lookup, so they are stored in the
+        ExcelHandler, cache and journal and the main pass does not repeat them.
+        """
+        for provider in providers:
+            def sample(country):
+                scraper.process_all_providers([country], excel_handler, [provider])
+                return excel_handler.results.get(country, provider)
+            self.profile(provider, countries, sample)
+
+    def _verified(self, candidates, countries, sampled, confirmations):
+        """True once the last remaining tier has `verify_samples` confirmations and has been checked
+        on every class of countries: countries answered alike by every known tier. A provider of
+        a tier missing from the matrix can only show itself on a class that was not sampled."""
+        column = next(iter(candidates.values()))
+        answered = [country for country, value in sampled.items() if value in PROFILE_VALUES]
+        needed = {self._country_class(country) for country in countries if country in column}
+        return confirmations >= self.verify_samples and needed <= {self._country_class(country) for country in answered}
+
+    def _country_class(self, country):
+        """The answers of every known tier for a country (None where a tier has no answer)."""
+        return tuple(column.get(country) for column in self.tiers.values())
+
+    def _next_sample(self, candidates, countries, sampled):
+        """Pick the unsampled country whose results split the candidate tiers most evenly.
+
+        With a single candidate left, pick a country from a class that has not been sampled yet,
+        so every pattern of answers in the matrix is checked against the provider once.
+        """
+        sampled_classes = {self._country_class(country) for country in sampled}
+        best, best_score = None, None
+        for country in countries:
+            if country in sampled:
+                continue
+            values = [column.get(country) for column in candidates.values()]
+            if None in values:
+                continue
+            if len(values) > 1:
+                # Fewer tiers sharing the most common answer = a more even split
+                score = max(values.count(value) for value in set(values))
+            else:
+                score = 0 if self._country_class(country) not in sampled_classes else 1
+            if best_score is None or score < best_score:
+                best, best_score = country, score
+        return best
+
+    def answer(self, country, provider):
+        """Return the matched tier's value for a pair, or None if it must be looked up live."""
+        label = self.assigned.get(provider)
+        if label is None:
+            return None
+        value = self.tiers[label].get(country)
+        if value is not None:
+            with self._lock:
+                self.stats["answered"] += 1
+        return value
+
+    def learn(self, results):
+        """Add the run's results to the matrix.
+
+        A matched provider fills in the countries its tier had no answer for. Any other provider
+        joins the tier whose known answers it agrees with on at least half of its countries, or
+        becomes a new tier.
+
+        Args:
+          - results: ResultStore of the run.
+        """
+        for provider in results.providers:
+            column = {country: results.get(country, provider) for country in results.countries}
+            column = {country: value for country, value in column.items() if value in PROFILE_VALUES}
+            if not column:
+                continue
+            label = self.assigned.get(provider)
+            if label is None:
+                label = self._matching_tier(column)
+            with self._lock:
+                if label is None:
+                    index = len(self.tiers) + 1
+                    while f"provider_tier{index}" in self.tiers:
+                        index += 1
+                    label = f"provider_tier{index}"
+                    self.tiers[label] = {}
+                tier = self.tiers[label]
+                for country, value in column.items():
+                    tier.setdefault(country, value)
+                self.providers[provider] = label
+
+    def _matching_tier(self, column):
+        """Return the tier agreeing with `column` on every shared country, covering at least half of it."""
+        for label, tier in self.tiers.items():
+            overlap = [country for country in column if country in tier]
+            if len(overlap) * 2 >= len(column) and all(tier[country] == column[country] for country in overlap):
+                return label
+        return None
+
+    def save(self):
+        """Write the tier x country matrix and the provider -> tier table to `path`."""
+        with self._lock:
+            profiles = {"tiers": self.tiers, "providers": self.providers}
+            with open(self.path, "w", encoding="utf-8") as profiles_file:
+                json.dump(profiles, profiles_file, indent=1, sort_keys=True)
+
+    def print_summary(self):
+        """Print how many providers were matched to a tier and how many lookups that saved."""
+        stats = self.stats
+        print(f"\nProvider profiling: {stats['matched']}/{stats['profiled']} providers matched a tier "
+              f"with {stats['samples']} sample lookups, {stats['answered']} lookups answered from the tier matrix "
+              f"({len(self.tiers)} tiers in {self.path})")
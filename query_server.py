@@ -0,0 +1,351 @@
+from concurrent.futures import Future, wait as wait_futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import argparse
+import json
+import queue
+import threading
+import time
+
+from config import load_config
+from result_cache import ResultCache
+from result_store import ResultStore
+
+# Seconds a waiting query blocks for its lookups before answering with what is known
+DEFAULT_WAIT_TIMEOUT = 60
+
+
+def parse_timeout(value):
+    """Return a client-supplied wait timeout in seconds; raises ValueError unless it is a number >= 0."""
+    if value is None:
+        return DEFAULT_WAIT_TIMEOUT
+    try:
+        timeout = None if isinstance(value, bool) else float(value)
+    except (TypeError, ValueError):
+        timeout = None
+    if timeout is None or not 0 <= timeout < float("inf"):
+        raise ValueError(f"timeout must be a number of seconds >= 0, not {value!r}")
+    return timeout
+
+
+class QueryService:
+    def __init__(self, cache=None, website_url=None, backend=None, stale_days=None, scraper_factory=None,
+                 retry_after=None):
+        """Initialize the in-memory index answering "does country X at provider Y need extra evidence?".
+
+        Every result in the ResultCache is loaded into a ResultStore once, so queries are
+        answered from memory. A pair that is missing, or older than `stale_days`, is queued for
+        a background lookup; concurrent queries for the same pair share one lookup, and queued
+        pairs of the same country are looked up together. Fresh results go to the index and
+        the cache. A pair whose lookup failed is answered with status 'error' and is not looked
+        up again for `retry_after` seconds, so repeated queries do not each start a scrape.
+
+        Args:
+          - cache: ResultCache to load from and write to (a new one on RESULT_CACHE_PATH by default).
+          - website_url: Document checklist website for background lookups (falls back to DOCUMENT_CHECKLIST_WEBSITE).
+          - backend: Scraper backend for background lookups (falls back to SCRAPER_BACKEND).
+          - stale_days: Age after which a result is refreshed in the background (QUERY_STALE_DAYS,
+            then the cache TTL).
+          - scraper_factory: Optional callable returning a scraper; defaults to create_scraper.
+          - retry_after: Seconds before a failed pair is looked up again (QUERY_RETRY_AFTER, default 300).
+        """
+        config = load_config()
+        self.website_url = website_url or config.website_url
+        self.cache = cache or ResultCache(website_url=self.website_url)
+        self.backend = backend or config.backend
+        stale_days = stale_days if stale_days is not None else config.get("QUERY_STALE_DAYS")
+        self.stale_seconds = float(stale_days) * 86400 if stale_days is not None else self.cache.ttl_seconds
+        self.scraper_factory = scraper_factory
+        self.retry_after = float(retry_after if retry_after is not None else config.get("QUERY_RETRY_AFTER", "300"))
+        self.scraper = None  # Started on the first background lookup and kept open
+        self.resolver = None
+
+        self.results = ResultStore()
+        self.checked_at = {}  # (country, provider) -> time the result was scraped
+        self.pending = {}  # (country, provider) -> Future of the lookup in flight
+        self.failed = {}  # (country, provider) -> time its last lookup failed, until a lookup succeeds
+        self.stats = {"queries": 0, "fresh": 0, "stale": 0, "missing": 0, "error": 0, "coalesced": 0,
+                      "lookups": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self._work = queue.Queue()
+        self._worker = None
+        self.load()
+
+    def load(self):
+        """Load every cached result into the index."""
+        entries = self.cache.entries()
+        with self._lock:
+            for country, provider, value, checked_at in entries:
+                self._index(country, provider, value, checked_at)
+        print(f"Query index loaded with {len(entries)} cached results ({self.cache.path}).")
+
+    def _index(self, country, provider, value, checked_at):
+        self.results.add_country(country)
+        self.results.add_provider(provider)
+        self.results.set(country, provider, value)
+        self.checked_at[(country, provider)] = checked_at
+
+    def _record(self, country, provider):
+        """Return the answer for a pair from the index (caller holds the lock)."""
+        value = self.results.get(country, provider) if (country, provider) in self.results else None
+        checked_at = self.checked_at.get((country, provider))
+        failed_at = self.failed.get((country, provider))
+        if failed_at is not None:
+            status = "error"
+        elif value is None:
+            status = "missing"
+        elif time.time() - checked_at > self.stale_seconds:
+            status = "stale"
+        else:
+            status = "fresh"
+        return {"country": country, "provider": provider, "value": value, "status": status,
+                "checked_at": checked_at, "failed_at": failed_at, "pending": (country, provider) in self.pending}
+
+    def _needs_lookup(self, record):
+        """Return True if a record's pair should be looked up: it is not fresh, and if its last lookup
+        failed, that was more than `retry_after` seconds ago (caller holds the lock)."""
+        if record["status"] == "error":
+            return time.time() - record["failed_at"] > self.retry_after
+        return record["status"] != "fresh"
+
+    def query(self, pairs, wait=False, timeout=DEFAULT_WAIT_TIMEOUT):
+        """Answer [(country, provider)] from the index, queueing lookups for missing and stale pairs.
+
+        With `wait`, blocks (up to `timeout` seconds) until those lookups have finished and answers
+        with their results. Returns one record per pair with 'value' ('Y', 'N' or None), 'status'
+        ('fresh', 'stale', 'missing' or 'error' if its last lookup failed), 'checked_at',
+        'failed_at' (time of the last failed lookup) and whether a lookup is 'pending'.
+        """
+        futures = []
+        with self._lock:
+            for country, provider in pairs:
+                record = self._record(country, provider)
+                self.stats["queries"] += 1
+                self.stats[record["status"]] += 1
+                if self._needs_lookup(record):
+                    futures.append(self._schedule(country, provider))
+        if wait and futures:
+            wait_futures(futures, timeout=timeout)
+        with self._lock:
+            return [self._record(country, provider) for country, provider in pairs]
+
+    def _schedule(self, country, provider):
+        """Return the Future of the lookup for a pair, starting one unless it is already in flight (caller holds the lock)."""
+        future = self.pending.get((country, provider))
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return future
+        future = Future()
+        self.pending[(country, provider)] = future
+        self._work.put((country, provider))
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run_lookups, name="query-lookups", daemon=True)
+            self._worker.start()
+        return future
+
+    def _run_lookups(self):
+        """Worker thread: take queued pairs, group them by country and look them up with one scraper."""
+        while True:
+            country, provider = self._work.get()
+            if country is None:
+                return
+            batch = {country: [provider]}
+            while True:
+                try:
+                    country, provider = self._work.get_nowait()
+                except queue.Empty:
+                    break
+                if country is None:
+                    self._work.put((None, None))
+                    break
+                batch.setdefault(country, []).append(provider)
+            for country, providers in batch.items():
+                self._lookup(country, list(dict.fromkeys(providers)))
+
+    def _lookup(self, country, providers):
+        """Look up one country's providers on the website and store the results."""
+        try:
+            scraper = self._ready_scraper(country, providers)
+            values = scraper.lookup_country(country, providers)
+            evidence = dict(scraper.evidence)
+        except Exception as e:
+            print(f"Background lookup failed for {country}: {e}")
+            values, evidence = {}, {}
+            self._close_scraper()  # Start over with a fresh scraper on the next lookup
+        now = time.time()
+        for provider in providers:
+            value = values.get(provider)
+            if value in ("Y", "N"):
+                self.cache.put(country, provider, value, evidence.get(provider))
+            with self._lock:
+                self.stats["lookups"] += 1
+                if value not in ("Y", "N"):
+                    self.stats["errors"] += 1
+                    self.failed[(country, provider)] = now
+                else:
+                    self.failed.pop((country, provider), None)
+                    self._index(country, provider, value, now)
+                future = self.pending.pop((country, provider), None)
+            if future is not None:
+                future.set_result(value)
+
+    def _ready_scraper(self, country, providers):
+        """Return the open scraper, starting it on first use, with the pair's names resolved to dropdown options."""
+        if self.scraper is None:
+            if self.scraper_factory:
+                scraper = self.scraper_factory()
+            else:
+                from base_scraper import create_scraper
+                scraper = create_scraper(self.backend, website_url=self.website_url)
+            scraper.open_website()
+            self.scraper = scraper
+            if self.resolver is None:
+                from name_resolver import NameResolver
+                self.resolver = NameResolver(website_url=self.website_url).load_or_build(scraper.fetch_option_lists)
+            scraper.set_resolved_options({}, {}, self.resolver)
+        # Names are resolved on first use and kept on the scraper, which re-resolves them if the dropdown changes
+        for kind, names in (("countries", [country]), ("providers", providers)):
+            resolved = self.scraper.resolved_options[kind]
+            names = [name for name in names if name not in resolved]
+            if names:
+                resolved.update(self.resolver.resolve_all(names, kind, report=False))
+        return self.scraper
+
+    def _close_scraper(self):
+        if self.scraper is not None:
+            try:
+                self.scraper.close_browser()
+            except Exception as e:
+                print(f"Warning: could not close the scraper cleanly ({e})")
+            self.scraper = None
+
+    def close(self):
+        """Stop the lookup worker, close the scraper and the cache."""
+        self._work.put((None, None))
+        if self._worker is not None:
+            self._worker.join()
+        self._close_scraper()
+        self.cache.close()
+
+
+class QueryServer:
+    def __init__(self, service, host=None, port=None):
+        """Serve a QueryService as JSON over HTTP.
+
+        Endpoints:
+          - GET  /result?country=X&provider=Y[&wait=1&timeout=S]: one pair.
+          - POST /results with {"queries": [{"country": X, "provider": Y}, ...], "wait": bool, "timeout": S}.
+          - GET  /stats: query and lookup counters.
+
+        Args:
+          - service: The QueryService answering the queries.
+          - host: Interface to listen on (QUERY_SERVER_HOST, default 127.0.0.1; keep it local).
+          - port: Port to listen on (QUERY_SERVER_PORT, default 8766; 0 picks a free port).
+        """
+        config = load_config()
+        self.service = service
+        host = host or config.get("QUERY_SERVER_HOST", "127.0.0.1")
+        port = int(port if port is not None else config.get("QUERY_SERVER_PORT", "8766"))
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        service = self.service
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _send_json(self, payload, status=200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                if url.path == "/stats":
+                    self._send_json({**service.stats, "indexed": len(service.checked_at)})
+                elif url.path == "/result":
+                    if not params.get("country") or not params.get("provider"):
+                        self._send_json({"error": "country and provider are required"}, 400)
+                        return
+                    wait = params.get("wait", "").lower() in ("1", "true", "yes")
+                    try:
+                        timeout = parse_timeout(params.get("timeout"))
+                    except ValueError as e:
+                        self._send_json({"error": str(e)}, 400)
+                        return
+                    self._send_json(service.query([(params["country"], params["provider"])], wait, timeout)[0])
+                else:
+                    self._send_json({"error": f"unknown path {url.path}"}, 404)
+
+            def do_POST(self):
+                if urlparse(self.path).path != "/results":
+                    self._send_json({"error": f"unknown path {self.path}"}, 404)
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    request = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+                    pairs = [(query["country"], query["provider"]) for query in request.get("queries", [])]
+                    timeout = parse_timeout(request.get("timeout"))
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    self._send_json({"error": f"invalid request: {e}"}, 400)
+                    return
+                results = service.query(pairs, bool(request.get("wait")), timeout)
+                self._send_json({"results": results})
+
+            def log_message(self, format, *args):
+                pass  # Queries are too frequent to log one line each
+
+        return Handler
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve in the calling thread until interrupted."""
+        self._server.serve_forever()
+
+    def stop(self):
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve cached Country Risk Scraper results as JSON over HTTP.")
+    parser.add_argument("--host", help="Interface to listen on (falls back to QUERY_SERVER_HOST, then 127.0.0.1)")
+    parser.add_argument("--port", type=int, help="Port to listen on (falls back to QUERY_SERVER_PORT, then 8766)")
+    parser.add_argument("--backend", choices=["selenium", "http"], help="Scraper backend for lookups on a miss")
+    parser.add_argument("--website-url", dest="website_url", help="Document checklist website for lookups on a miss")
+    parser.add_argument("--stale-days", dest="stale_days", type=float,
+                        help="Refresh results older than this in the background (falls back to QUERY_STALE_DAYS, then the cache TTL)")
+    args = parser.parse_args()
+
+    service = QueryService(website_url=args.website_url, backend=args.backend, stale_days=args.stale_days)
+    server = QueryServer(service, args.host, args.port)
+    print(f"Query server running at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
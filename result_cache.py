@@ -0,0 +1,110 @@
+from urllib.parse import urlparse
+import json
+import sqlite3
+import threading
+import time
+
+from config import load_config
+
+
+class ResultCache:
+    def __init__(self, path=None, ttl_days=None, rule_snapshot=None, force_refresh=False, website_url=None):
+        """Initialize the on-disk cache of evidence results.
+
+        Results are keyed by (country, provider, rule snapshot) so a change to the
+        country/provider risk ratings can be forced through by changing the snapshot label.
+        The snapshot is "<label>@<website host>", so runs against the local fixture or another
+        site never answer lookups for the live website from the same file.
+
+        Args:
+          - path: SQLite file (falls back to RESULT_CACHE_PATH, then results_cache.sqlite3).
+          - ttl_days: Days before an entry expires (falls back to RESULT_CACHE_TTL_DAYS, then 7).
+          - rule_snapshot: Label of the current risk rating rules (falls back to RULE_SNAPSHOT, then "current").
+          - force_refresh: Ignore cached entries and re-scrape everything (results are still stored).
+          - website_url: Website the results come from (falls back to DOCUMENT_CHECKLIST_WEBSITE).
+        """
+        config = load_config()
+        self.path = path or config.get("RESULT_CACHE_PATH", "results_cache.sqlite3")
+        self.ttl_seconds = float(ttl_days if ttl_days is not None else config.get("RESULT_CACHE_TTL_DAYS", "7")) * 86400
+        host = urlparse(website_url or config.website_url).netloc.lower()
+        self.rule_snapshot = f"{rule_snapshot or config.get('RULE_SNAPSHOT', 'current')}@{host}"
+        self.force_refresh = force_refresh
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                   country TEXT NOT NULL,
+                   provider TEXT NOT NULL,
+                   rule_snapshot TEXT NOT NULL,
+                   value TEXT NOT NULL,
+                   checked_at REAL NOT NULL,
+                   evidence TEXT,
+                   PRIMARY KEY (country, provider, rule_snapshot)
+               )"""
+        )
+        # Caches written before evidence records were kept have no evidence column yet
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(results)")]
+        if "evidence" not in columns:
+            self.connection.execute("ALTER TABLE results ADD COLUMN evidence TEXT")
+        self.connection.commit()
+
+    def get(self, country, provider):
+        """Return the cached 'Y'/'N' value for a pair, or None on a miss, an expired entry or a forced refresh."""
+        row = None
+        if not self.force_refresh:
+            with self._lock:
+                row = self.connection.execute(
+                    "SELECT value FROM results WHERE country = ? AND provider = ? AND rule_snapshot = ? AND checked_at >= ?",
+                    (country, provider, self.rule_snapshot, time.time() - self.ttl_seconds),
+                ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def get_details(self, country, provider):
+        """Return the evidence record stored with a pair's cached value, or None (does not count as a hit or miss)."""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT evidence FROM results WHERE country = ? AND provider = ? AND rule_snapshot = ?",
+                (country, provider, self.rule_snapshot),
+            ).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def put(self, country, provider, value, details=None):
+        """Store the value for a pair, and its evidence record if given, with the current timestamp."""
+        evidence = json.dumps(details) if details is not None else None
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results (country, provider, rule_snapshot, value, checked_at, evidence) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (country, provider, self.rule_snapshot, value, time.time(), evidence),
+            )
+            self.connection.commit()
+
+    def entries(self):
+        """Return [(country, provider, value, checked_at)] for every entry of the current snapshot, expired ones included."""
+        with self._lock:
+            return self.connection.execute(
+                "SELECT country, provider, value, checked_at FROM results WHERE rule_snapshot = ?",
+                (self.rule_snapshot,),
+            ).fetchall()
+
+    def purge_expired(self):
+        """Delete expired entries and return how many were removed."""
+        with self._lock:
+            cursor = self.connection.execute("DELETE FROM results WHERE checked_at < ?", (time.time() - self.ttl_seconds,))
+            self.connection.commit()
+        return cursor.rowcount
+
+    def print_summary(self):
+        """Print cache hits and misses for this run."""
+        print(f"Result cache: {self.hits} hits, {self.misses} misses ({self.path}, snapshot '{self.rule_snapshot}')")
+
+    def close(self):
+        """Close the cache database."""
+        self.connection.close()
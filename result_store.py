@@ -0,0 +1,121 @@
+from itertools import compress
+from operator import and_, ne
+import sys
+
+# One byte per (country, provider) cell
+UNKNOWN, NO, YES, ERROR = 0, 1, 2, 3
+CODES = {"N": NO, "Y": YES, "ERROR": ERROR}
+VALUES = {NO: "N", YES: "Y", ERROR: "ERROR"}
+STATUS_NAMES = {UNKNOWN: "unknown", NO: "N", YES: "Y", ERROR: "ERROR"}
+
+# bytes.translate table mapping Y/N cells to 1 and unknown/error cells to 0
+_KNOWN = bytes(1 if code in (NO, YES) else 0 for code in range(256))
+# bytes.translate table mapping error cells to 1 and everything else to 0
+_IS_ERROR = bytes(1 if code == ERROR else 0 for code in range(256))
+
+
+class ResultStore:
+    """Compact matrix of evidence results: one bytearray column per provider, one byte per country.
+
+    Country and provider names are interned and mapped to row and column indexes once, so
+    updates are O(1) index lookups and summaries run over whole columns with the C-level
+    bytes/bytearray methods rather than per-cell Python code.
+    """
+
+    def __init__(self, countries=(), providers=()):
+        """
+        Args:
+          - countries: Country names, in output order (duplicates are ignored).
+          - providers: Provider names, in output order (duplicates are ignored).
+        """
+        self.countries = []
+        self.providers = []
+        self._country_ids = {}   # country -> row index
+        self._provider_ids = {}  # provider -> column index
+        self._columns = []       # one bytearray of status codes per provider
+        self.details = {}        # (country, provider) -> structured evidence record, only for pairs that have one
+        for country in countries:
+            self.add_country(country)
+        for provider in providers:
+            self.add_provider(provider)
+
+    def add_country(self, country):
+        """Add a row (all cells unknown) and return its index; an existing country keeps its index."""
+        if country not in self._country_ids:
+            self._country_ids[country] = len(self.countries)
+            self.countries.append(sys.intern(country))
+            for column in self._columns:
+                column.append(UNKNOWN)
+        return self._country_ids[country]
+
+    def add_provider(self, provider):
+        """Add a column (all cells unknown) and return its index; an existing provider keeps its index."""
+        if provider not in self._provider_ids:
+            self._provider_ids[provider] = len(self.providers)
+            self.providers.append(sys.intern(provider))
+            self._columns.append(bytearray(len(self.countries)))
+        return self._provider_ids[provider]
+
+    def __contains__(self, pair):
+        country, provider = pair
+        return country in self._country_ids and provider in self._provider_ids
+
+    def set(self, country, provider, value, details=None):
+        """Store 'Y', 'N' or 'ERROR' for a pair, and its evidence record if given.
+
+        Raises KeyError for an unknown country, provider or value.
+        """
+        self._columns[self._provider_ids[provider]][self._country_ids[country]] = CODES[value]
+        if details is not None:
+            self.details[(country, provider)] = details
+        else:
+            self.details.pop((country, provider), None)
+
+    def get(self, country, provider, default=None):
+        """Return 'Y', 'N' or 'ERROR' for a pair, or `default` if it has no result yet."""
+        code = self._columns[self._provider_ids[provider]][self._country_ids[country]]
+        return VALUES.get(code, default)
+
+    def get_details(self, country, provider):
+        """Return the evidence record stored for a pair, or None."""
+        return self.details.get((country, provider))
+
+    def row(self, country, default=None):
+        """Return the values of one country in provider order."""
+        index = self._country_ids[country]
+        return [VALUES.get(column[index], default) for column in self._columns]
+
+    def rows(self, default=None):
+        """Yield (country, [values in provider order]) for every country."""
+        for index, country in enumerate(self.countries):
+            yield country, [VALUES.get(column[index], default) for column in self._columns]
+
+    def to_dict(self, default=None):
+        """Return the results as {country: {provider: value}}."""
+        return {country: dict(zip(self.providers, values)) for country, values in self.rows(default)}
+
+    def counts(self):
+        """Return {provider: {'Y': n, 'N': n, 'ERROR': n, 'unknown': n}}."""
+        return {provider: {name: column.count(code) for code, name in STATUS_NAMES.items()}
+                for provider, column in zip(self.providers, self._columns)}
+
+    def errors(self):
+        """Return the (country, provider) pairs whose lookup failed, provider by provider."""
+        return [(country, provider) for provider, column in zip(self.providers, self._columns)
+                for country in compress(self.countries, column.translate(_IS_ERROR))]
+
+    def differing(self, provider_a, provider_b):
+        """Return the countries whose Y/N result differs between two providers (unknown and errors are skipped)."""
+        column_a = self._columns[self._provider_ids[provider_a]]
+        column_b = self._columns[self._provider_ids[provider_b]]
+        both_known = map(and_, column_a.translate(_KNOWN), column_b.translate(_KNOWN))
+        return list(compress(self.countries, map(and_, map(ne, column_a, column_b), both_known)))
+
+    def print_summary(self):
+        """Print the result counts per provider and how many countries differ from the first provider."""
+        print("\nResults per provider:")
+        for provider, counts in self.counts().items():
+            print(f"  {provider}: Y={counts['Y']} N={counts['N']} ERROR={counts['ERROR']} unknown={counts['unknown']}")
+        for provider in self.providers[1:]:
+            differing = self.differing(self.providers[0], provider)
+            print(f"  {len(differing)} countries differ between {self.providers[0]} and {provider}")
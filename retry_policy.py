@@ -0,0 +1,58 @@
+import random
+import time
+
+from config import load_config
+
+# Retries allowed per scraper step before the (country, provider) lookup is marked as failed
+DEFAULT_RETRY_BUDGETS = {
+    "select_country": 2,
+    "select_education_provider": 2,
+    "select_radio_option": 2,
+    "click_display_evidence": 3,   # Covers a postback that never replaced the evidence section
+    "check_evidence_on_page": 1,
+}
+
+
+class StepFailedError(Exception):
+    """A scraper step still failed after its retries; the lookup it belongs to has no result."""
+
+
+class PermanentStepError(Exception):
+    """A step failure that retrying cannot fix, such as a name missing from the dropdown."""
+
+
+class StalePageError(Exception):
+    """The page after Display Evidence still shows the previous results."""
+
+
+class RetryPolicy:
+    def __init__(self, budgets=None, base_delay=None, max_delay=None):
+        """Initialize the retry policy for scraper steps.
+
+        Args:
+          - budgets: Dict overriding DEFAULT_RETRY_BUDGETS per step.
+          - base_delay: First backoff delay in seconds (RETRY_BASE_DELAY, default 0.5).
+          - max_delay: Longest backoff delay in seconds (RETRY_MAX_DELAY, default 8).
+        """
+        config = load_config()
+        self.budgets = dict(DEFAULT_RETRY_BUDGETS)
+        if budgets:
+            self.budgets.update(budgets)
+        self.base_delay = float(base_delay if base_delay is not None else config.get("RETRY_BASE_DELAY", "0.5"))
+        self.max_delay = float(max_delay if max_delay is not None else config.get("RETRY_MAX_DELAY", "8"))
+
+    def budget(self, step):
+        """Number of retries allowed for a step."""
+        return self.budgets.get(step, 0)
+
+    def should_retry(self, step, attempt, error):
+        """Return True if the step may run again after failing on retry number `attempt` (0 = first try)."""
+        return not isinstance(error, PermanentStepError) and attempt < self.budget(step)
+
+    def backoff(self, attempt):
+        """Seconds to wait before retry `attempt`: exponential growth with full jitter."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def sleep(self, attempt):
+        """Wait out the backoff before retry `attempt`."""
+        time.sleep(self.backoff(attempt))
@@ -0,0 +1,63 @@
+import queue
+import threading
+import time
+
+
+class RunCancelled(Exception):
+    """The run was cancelled through its RunControl."""
+
+
+class RunControl:
+    """Pause / cancel switch and progress channel between a scraping run and the window watching it.
+
+    The scraper calls checkpoint() between lookups and report() for every stored result; the
+    watcher reads `events` from its own thread and calls pause(), resume() or cancel().
+    Events are tuples: ("begin", total lookups, providers per country, time),
+    ("result", country, provider, value, time) and ("done", error or None, time).
+    """
+
+    def __init__(self):
+        self.events = queue.Queue()
+        self.metrics = None  # StepMetrics of the run, for showing the latest step latencies
+        self._running = threading.Event()
+        self._running.set()
+        self._cancelled = threading.Event()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def pause(self):
+        """Hold the run at its next checkpoint."""
+        self._running.clear()
+
+    def resume(self):
+        """Let a paused run continue."""
+        self._running.set()
+
+    def cancel(self):
+        """Stop the run at its next checkpoint (a paused run stops straight away)."""
+        self._cancelled.set()
+        self._running.set()
+
+    def checkpoint(self):
+        """Block while the run is paused; raise RunCancelled once it has been cancelled."""
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise RunCancelled("run cancelled")
+
+    def begin(self, total, providers_per_country):
+        """Announce how many lookups the run will store."""
+        self.events.put(("begin", total, providers_per_country, time.time()))
+
+    def report(self, country, provider, value):
+        """Announce one stored result."""
+        self.events.put(("result", country, provider, value, time.time()))
+
+    def finish(self, error=None):
+        """Announce the end of the run ('cancelled', an error message, or None on success)."""
+        self.events.put(("done", error, time.time()))
@@ -0,0 +1,72 @@
+import json
+import os
+import threading
+import time
+
+from config import load_config
+
+
+class RunJournal:
+    def __init__(self, path=None, resume=False):
+        """Open the append-only journal of completed (country, provider) lookups.
+
+        Every result is appended and flushed to disk as soon as it is known, so an
+        interrupted run can be resumed from the journal instead of from the first country.
+
+        Args:
+          - path: Journal file (falls back to RUN_JOURNAL_PATH, then run_journal.jsonl).
+          - resume: Reload the results already in the journal; otherwise start a new journal.
+        """
+        config = load_config()
+        self.path = path or config.get("RUN_JOURNAL_PATH", "run_journal.jsonl")
+        self.completed = {}  # (country, provider) -> value
+        self._lock = threading.Lock()
+
+        if resume:
+            self.completed = self.load(self.path)
+            print(f"Resuming run: {len(self.completed)} results loaded from {self.path}")
+        self.file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        if resume and self._ends_with_torn_line(self.path):
+            self.file.write("\n")  # Keep the next entry off the torn line
+
+    @staticmethod
+    def load(path):
+        """Read a journal file and return {(country, provider): value}. A torn last line is ignored."""
+        completed = {}
+        if not os.path.exists(path):
+            return completed
+        with open(path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                    completed[(entry["country"], entry["provider"])] = entry["value"]
+                except (ValueError, KeyError):
+                    continue  # Partially written line from an interrupted run
+        return completed
+
+    @staticmethod
+    def _ends_with_torn_line(path):
+        """Return True if the file is non-empty and does not end with a newline."""
+        with open(path, "rb") as journal:
+            journal.seek(0, os.SEEK_END)
+            if journal.tell() == 0:
+                return False
+            journal.seek(-1, os.SEEK_END)
+            return journal.read(1) != b"\n"
+
+    def get(self, country, provider):
+        """Return the journaled value for a pair, or None if it has not been completed."""
+        return self.completed.get((country, provider))
+
+    def record(self, country, provider, value):
+        """Append a completed lookup and flush it to disk."""
+        entry = {"country": country, "provider": provider, "value": value, "time": time.time()}
+        with self._lock:
+            self.completed[(country, provider)] = value
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        """Close the journal file."""
+        self.file.close()
@@ -0,0 +1,134 @@
+import csv
+import json
+import os
+import time
+
+from config import load_config
+
+# Results that can be carried forward to the next run; anything else is looked up again
+CARRIED_VALUES = ("Y", "N")
+
+
+class RunManifest:
+    def __init__(self, path=None, sample_size=None, rule_snapshot=None):
+        """Initialize the manifest of the last run, used by diff mode.
+
+        The manifest records the countries, providers and results of a run. In diff mode only
+        (country, provider) pairs that are new since the last run, or that had no result, are
+        looked up; every other result is carried forward, except for a rolling sample of old
+        pairs that is re-checked each run to catch changes on the website.
+
+        Args:
+          - path: JSON file holding the manifest (falls back to RUN_MANIFEST_PATH, then run_manifest.json).
+          - sample_size: Old pairs re-checked per run (falls back to DIFF_SAMPLE_SIZE, then 10).
+          - rule_snapshot: Label of the current risk rating rules (falls back to RULE_SNAPSHOT, then "current");
+            results from a run under a different snapshot are never carried forward.
+        """
+        config = load_config()
+        self.path = path or config.get("RUN_MANIFEST_PATH", "run_manifest.json")
+        self.sample_size = int(sample_size if sample_size is not None else config.get("DIFF_SAMPLE_SIZE", "10"))
+        self.rule_snapshot = rule_snapshot or config.get("RULE_SNAPSHOT", "current")
+        self.previous = self.load(self.path)
+        self.carried = {}       # (country, provider) -> value taken from the last run
+        self.sampled = set()    # Old pairs re-checked on the website this run
+        self.sample_offset = 0  # Where the rolling sample starts next run
+
+    @staticmethod
+    def load(path):
+        """Return the manifest stored at `path`, or None if there is none."""
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+
+    def previous_results(self):
+        """Return the last run's results as {country: {provider: value}} (empty if they cannot be reused)."""
+        if not self.previous or self.previous.get("rule_snapshot") != self.rule_snapshot:
+            return {}
+        return self.previous.get("results", {})
+
+    def plan(self, countries, providers):
+        """Decide which pairs to carry forward and which old pairs to sample, and print the differences."""
+        previous = self.previous_results()
+        if self.previous and not previous:
+            print(f"Last run used rule snapshot '{self.previous.get('rule_snapshot')}'; checking every pair again.")
+
+        old_pairs = sorted((country, provider) for country in countries for provider in providers
+                           if previous.get(country, {}).get(provider) in CARRIED_VALUES)
+        offset = (self.previous or {}).get("sample_offset", 0) % len(old_pairs) if old_pairs else 0
+        sample = (old_pairs[offset:] + old_pairs[:offset])[:self.sample_size]
+        self.sampled = set(sample)
+        self.sample_offset = offset + len(sample)
+        self.carried = {pair: previous[pair[0]][pair[1]] for pair in old_pairs if pair not in self.sampled}
+
+        previous_countries = set((self.previous or {}).get("countries", []))
+        previous_providers = set((self.previous or {}).get("providers", []))
+        added_countries = [country for country in countries if country not in previous_countries]
+        removed_countries = sorted(previous_countries - set(countries))
+        added_providers = [provider for provider in providers if provider not in previous_providers]
+        removed_providers = sorted(previous_providers - set(providers))
+        total = len(countries) * len(providers)
+
+        print(f"Diff against {self.path}:")
+        print(f"  Countries added: {len(added_countries)}, removed: {len(removed_countries)}")
+        if added_providers or removed_providers:
+            print(f"  Providers added: {', '.join(added_providers) or '-'}; removed: {', '.join(removed_providers) or '-'}")
+        print(f"  Carried forward: {len(self.carried)}/{total}, re-checked as a sample: {len(self.sampled)}, "
+              f"new or unresolved: {total - len(old_pairs)}")
+
+    def get(self, country, provider):
+        """Return the value carried forward for a pair, or None if it must be looked up."""
+        return self.carried.get((country, provider))
+
+    def is_sampled(self, country, provider):
+        """Return True if the pair is re-checked on the website this run, bypassing the cache."""
+        return (country, provider) in self.sampled
+
+    def write_changelog(self, results, path=None):
+        """Write the pairs whose result changed since the last run to a CSV file and return them.
+
+        Args:
+          - results: {country: {provider: value}} of this run (ResultStore.to_dict()).
+          - path: CSV file (falls back to DIFF_CHANGELOG_PATH, then changelog.csv).
+        """
+        path = path or load_config().get("DIFF_CHANGELOG_PATH", "changelog.csv")
+        previous = self.previous_results()
+        changes = []
+        for country, values in results.items():
+            for provider, value in values.items():
+                before = previous.get(country, {}).get(provider)
+                if before in CARRIED_VALUES and value in CARRIED_VALUES and before != value:
+                    changes.append((country, provider, before, value, "sample" if self.is_sampled(country, provider) else "new"))
+        for country in sorted(set(previous) - set(results)):
+            for provider, before in previous[country].items():
+                changes.append((country, provider, before, "", "removed"))
+
+        with open(path, "w", newline="", encoding="utf-8") as changelog:
+            writer = csv.writer(changelog)
+            writer.writerow(["Country", "Provider", "Previous", "Current", "Checked as"])
+            writer.writerows(changes)
+
+        flipped = [change for change in changes if change[3]]
+        drifted = [change for change in flipped if change[4] == "sample"]
+        print(f"Changelog written to {path}: {len(flipped)} results flipped between Y and N since the last run.")
+        for country, provider, before, value, _ in flipped:
+            print(f"  {country} / {provider}: {before} -> {value}")
+        if drifted:
+            print(f"  {len(drifted)} of {len(self.sampled)} sampled pairs changed; consider a full run without --diff.")
+        return changes
+
+    def save(self, countries, providers, results):
+        """Store this run's countries, providers and results as the manifest for the next diff."""
+        manifest = {
+            "saved_at": time.time(),
+            "rule_snapshot": self.rule_snapshot,
+            "countries": list(countries),
+            "providers": list(providers),
+            "sample_offset": self.sample_offset,
+            "results": results,
+        }
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=1)
+        os.replace(temp_path, self.path)
+        print(f"Run manifest saved to {self.path}")
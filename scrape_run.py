@@ -0,0 +1,186 @@
+from excel_handler import ExcelHandler
+from result_cache import ResultCache
+from run_journal import RunJournal
+from run_manifest import RunManifest
+from run_control import RunCancelled
+from instrumentation import StepMetrics
+from name_resolver import NameResolver
+from tier_learner import TierLearner
+from provider_profiler import ProviderProfiler
+from scraper_warmup import build_scraper, open_scraper
+import time
+
+
+def run_providers(user_inputs, config):
+    """Providers to compare: the inputs' 'providers', or the two universities plus ADDITIONAL_PROVIDERS."""
+    if user_inputs.get('providers'):
+        return list(dict.fromkeys(user_inputs['providers']))
+    return [user_inputs['uni1_name'], user_inputs['uni2_name']] + config.additional_providers
+
+
+def run_scrape(user_inputs, config, control=None, resume=False, diff=False, warmup=None, update_input=True):
+    """Run the whole scrape for one workbook and return a summary of the run.
+
+    Args:
+      - user_inputs: Dict with 'input_filename', 'sheet_name', 'website_url', 'output_filename'
+        and either 'uni1_name' / 'uni2_name' or a 'providers' list.
+      - config: The shared Config.
+      - control: Optional RunControl for pausing / cancelling and progress reports.
+      - resume: Reload the run journal and skip the pairs it already holds.
+      - diff: Only check pairs that are new since the last run, plus a rolling sample.
+      - warmup: Optional ScraperWarmup whose scraper is used instead of starting a new one.
+      - update_input: Also write the first two providers' results back into columns B and C of the
+        input workbook; "all" writes every provider, with a header for columns D onwards.
+
+    Returns a dict with 'status' ('completed' or 'cancelled'), the result counts per provider,
+    the failed lookups, cache hits and misses and the run's timings. A cancelled run writes
+    no output files.
+    """
+    run_started = time.perf_counter()
+    providers = run_providers(user_inputs, config)
+    print("Configuration received:")
+    print(f"  Input file: {user_inputs['input_filename']}")
+    print(f"  Sheet name: {user_inputs['sheet_name']}")
+    print(f"  Website URL: {user_inputs['website_url']}")
+    print(f"  Providers: {', '.join(providers)}")
+    print(f"  Output file: {user_inputs['output_filename']}")
+
+    # Initialize the Excel handler with user-provided values
+    excel_loader = ExcelHandler(
+        filename=user_inputs['input_filename'],
+        sheetname=user_inputs['sheet_name'],
+        uni1_name=providers[0],
+        uni2_name=providers[1] if len(providers) > 1 else None,
+        providers=providers
+    )
+
+    # Results cache: only (country, provider) pairs that are missing or expired go to the website
+    cache = ResultCache(force_refresh=config.cache_refresh, website_url=user_inputs['website_url'])
+
+    # Journal every completed lookup so an interrupted run can be continued with --resume
+    journal = RunJournal(resume=resume)
+
+    # Manifest of the last run: in diff mode unchanged pairs are carried forward from it
+    manifest = RunManifest()
+    if diff:
+        manifest.plan(excel_loader.countries, providers)
+
+    # Optionally answer lookups from the country's risk tier once the tier's outcome is confirmed
+    tier_learner = TierLearner() if config.tier_dedup else None
+
+    # Optionally place each provider in a known provider tier from a few samples instead of checking every country
+    provider_profiler = ProviderProfiler() if config.provider_profiling else None
+
+    # Per-step timings for the end-of-run report and trace file
+    metrics = StepMetrics()
+    if control:
+        providers_per_country = len(excel_loader.results.providers)
+        control.metrics = metrics
+        control.begin(len(excel_loader.countries) * providers_per_country, providers_per_country)
+
+    status = None
+    startup_seconds = None
+    scraper = None
+    try:
+        # Reuse the scraper warmed up while the settings were entered, or start one now
+        scraper = warmup.take(user_inputs['website_url']) if warmup else None
+        if scraper is None:
+            scraper = build_scraper(config, user_inputs['website_url'])
+            open_scraper(scraper)
+        scraper.cache = cache
+        scraper.journal = journal
+        scraper.manifest = manifest if diff else None
+        scraper.metrics = metrics
+        scraper.control = control
+        scraper.tier_learner = tier_learner
+        scraper.provider_profiler = provider_profiler
+
+        # Map spreadsheet names onto the website's dropdown options before the run starts
+        resolver = NameResolver(website_url=user_inputs['website_url']).load_or_build(scraper.fetch_option_lists)
+        scraper.set_resolved_options(resolver.resolve_all(excel_loader.countries, "countries"),
+                                     resolver.resolve_all(providers, "providers"), resolver)
+
+        # Time from Start to the first lookup, recorded with the step timings
+        startup_seconds = time.perf_counter() - run_started
+        metrics.record("startup", startup_seconds)
+        print(f"Ready for the first lookup {startup_seconds:.1f}s after start.")
+
+        # Sample a few countries per provider to match it to a known provider tier
+        if provider_profiler:
+            provider_profiler.profile_run(scraper, excel_loader, excel_loader.countries, providers)
+
+        # Process each country once, checking every provider before moving on
+        scraper.process_all_providers(excel_loader.countries, excel_loader, providers)
+        status = "completed"
+    except RunCancelled:
+        # Completed lookups are already in the journal; no output files are written
+        status = "cancelled"
+        print("\nRun cancelled. Start again with --resume to continue from the completed lookups.")
+    finally:
+        cache.close()
+        journal.close()
+        if status != "completed" and scraper is not None:
+            # Cancelled, failed or failed to start: nothing else will use the browser(s), so none are left running
+            scraper.close_browser()
+
+    if status == "completed":
+        try:
+            # Report how long each step spent waiting on the website
+            scraper.print_wait_summary()
+            metrics.print_report()
+            metrics.write_trace(config.trace_path)
+            cache.print_summary()
+            if tier_learner:
+                tier_learner.print_summary()
+                tier_learner.save_learned()
+            if provider_profiler:
+                provider_profiler.print_summary()
+                provider_profiler.learn(excel_loader.results)
+                provider_profiler.save()
+
+            # Record what changed since the last run and store this run as the baseline for the next diff
+            if diff:
+                manifest.write_changelog(excel_loader.results.to_dict())
+            manifest.save(excel_loader.countries, providers, excel_loader.results.to_dict())
+
+            # Result counts per provider and how many countries differ between them
+            excel_loader.results.print_summary()
+
+            # Save updated values to the original Excel file
+            if update_input:
+                excel_loader.save_to_excel(all_providers=update_input == "all")
+
+            # Export final dictionary to a new Excel file with user-specified filename
+            excel_loader.export_to_excel(user_inputs['output_filename'])
+
+            # Optionally write the results to a CSV / JSON Lines / Parquet file as well
+            if config.results_sink:
+                excel_loader.export_results(config.results_sink)
+
+            # Optionally write the structured evidence record (categories, risk levels, page hash) behind each result
+            if config.evidence_details_path:
+                excel_loader.export_evidence(config.evidence_details_path)
+        finally:
+            # Close the browser(s) when done, even if writing an output failed
+            scraper.close_browser()
+
+    steps = metrics.step_summary()
+    steps.pop("startup", None)
+    return {
+        "status": status,
+        "input_filename": user_inputs['input_filename'],
+        "sheet_name": user_inputs['sheet_name'],
+        "output_filename": user_inputs['output_filename'] if status == "completed" else None,
+        "providers": providers,
+        "countries": len(excel_loader.countries),
+        "counts": excel_loader.results.counts(),
+        "failures": [{"country": country, "provider": provider} for country, provider in excel_loader.results.errors()],
+        "cache": {"hits": cache.hits, "misses": cache.misses},
+        "timings": {
+            "wall_seconds": round(time.perf_counter() - run_started, 3),
+            "startup_seconds": round(startup_seconds, 3) if startup_seconds is not None else None,
+            "steps": {step: {key: round(entry[key], 4) if isinstance(entry[key], float) else entry[key]
+                             for key in ("calls", "failures", "retries", "p50", "p90", "max")}
+                      for step, entry in steps.items()},
+        },
+    }
@@ -0,0 +1,237 @@
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
+
+from base_scraper import RESULT_ERROR, create_scraper, stored_result, record_result
+from config import load_config
+from run_control import RunCancelled
+
+
+class ScraperPool:
+    def __init__(self, website_url=None, workers=None, headless=True, scraper_factory=None, backend=None):
+        """Initialize a pool of independent scrapers that share one (country, provider) work queue.
+
+        Args:
+          - website_url: Document checklist website URL passed to every scraper.
+          - workers: Number of browser instances (falls back to the config's SCRAPER_WORKERS).
+          - headless: Launch the pooled browsers without a visible window.
+          - scraper_factory: Optional callable taking the worker index and returning a new scraper;
+            defaults to create_scraper.
+          - backend: Scraper backend for the default factory ('selenium' or 'http').
+        """
+        self.website_url = website_url
+        self.workers = max(1, int(workers or load_config().workers))
+        self.headless = headless
+        self.backend = backend
+        self.scraper_factory = scraper_factory or self._default_factory
+        self.scrapers = []
+        self.cache = None  # Optional ResultCache consulted before queueing a pair
+        self.journal = None  # Optional RunJournal receiving every completed lookup
+        self.manifest = None  # Optional RunManifest carrying results forward in diff mode
+        self.metrics = None  # Optional StepMetrics shared by every pooled scraper
+        self.control = None  # Optional RunControl for pausing / cancelling and progress reports
+        self.tier_learner = None  # Optional TierLearner shared by every pooled scraper
+        self.provider_profiler = None  # Optional ProviderProfiler shared by every pooled scraper
+        self.resolved_options = None  # (countries, providers) option maps handed to every scraper
+
+    def _default_factory(self, index):
+        """Create a scraper for one pool worker, with its own browser profile directory.
+
+        Workers always launch their own browser: attaching every worker to the same running
+        Chrome (CHROME_DEBUGGER_ADDRESS) would have them drive one tab at the same time.
+        """
+        return create_scraper(self.backend, website_url=self.website_url, headless=self.headless,
+                              profile_name=f"worker{index}", debugger_address="")
+
+    def _start_scraper(self, index):
+        """Create a scraper and load the website in it."""
+        scraper = self.scraper_factory(index)
+        scraper.name = f"worker{index}"
+        scraper.metrics = self.metrics
+        scraper.tier_learner = self.tier_learner
+        scraper.provider_profiler = self.provider_profiler
+        if self.resolved_options:
+            scraper.set_resolved_options(*self.resolved_options)
+        try:
+            scraper.open_website()
+        except Exception:
+            scraper.close_browser()
+            raise
+        return scraper
+
+    def start(self):
+        """Launch all pool scrapers in parallel. Scrapers are kept open and reused across calls.
+
+        An already started pool (e.g. one warmed up before the run was configured) only hands
+        its current metrics, tier learner and provider profiler to its scrapers.
+        """
+        if self.scrapers:
+            for scraper in self.scrapers:
+                scraper.metrics = self.metrics
+                scraper.tier_learner = self.tier_learner
+                scraper.provider_profiler = self.provider_profiler
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self._start_scraper, index) for index in range(self.workers)]
+        started, errors = [], []
+        for future in futures:
+            try:
+                started.append(future.result())
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            # Close the workers that did start, since the caller never gets hold of them
+            for scraper in started:
+                scraper.close_browser()
+            raise errors[0]
+        self.scrapers = started
+        print(f"Scraper pool started with {self.workers} workers.")
+
+    def fetch_option_lists(self):
+        """Read the dropdown option lists through the first pooled scraper."""
+        self.start()
+        return self.scrapers[0].fetch_option_lists()
+
+    def set_resolved_options(self, countries, providers, resolver=None):
+        """Hand pre-resolved dropdown options to every pooled scraper, including ones started later."""
+        self.resolved_options = (countries, providers, resolver)
+        for scraper in self.scrapers:
+            scraper.set_resolved_options(countries, providers, resolver)
+
+    def process_all_providers(self, countries, excel_handler, providers):
+        """
+        Check every (country, provider) pair across the pool and store the results in the ExcelHandler.
+
+        Work is queued per country: a worker selects the passport country once and checks all
+        of that country's outstanding providers by swapping only the provider dropdown. Pairs
+        found in the journal or cache are never queued, and results are merged into the
+        ExcelHandler, cache and journal from the calling thread only.
+
+        Args:
+          - countries: List of country names from the ExcelHandler.
+          - excel_handler: Instance of ExcelHandler to store the results.
+          - providers: List of education providers to check.
+        """
+        work = self._pending_work(countries, excel_handler, providers)
+        if not work:
+            print(f"All results for providers {', '.join(providers)} were already known.")
+            return
+
+        self.start()
+        failed = self._run_work(work, excel_handler)
+        if failed:
+            # One batch retry at the end of the pass, each worker on a freshly loaded page
+            print(f"Retrying {sum(len(pending) for _, pending in failed)} failed lookups...")
+            for scraper in self.scrapers:
+                scraper.open_website()
+            for country, pending in self._run_work(failed, excel_handler):
+                print(f"Lookups still failing for {country} with providers {', '.join(pending)}; marked as {RESULT_ERROR}.")
+        print(f"All countries processed for providers: {', '.join(providers)}")
+
+    def _run_work(self, items, excel_handler):
+        """Run [(country, [providers])] across the pool, store the results and return the failed lookups in the same shape."""
+        work = queue.Queue()
+        for item in items:
+            work.put(item)
+        total = sum(len(pending) for _, pending in items)
+        results = queue.Queue()
+
+        def worker(scraper):
+            while True:
+                try:
+                    self.checkpoint()
+                    country, pending = work.get_nowait()
+                except (queue.Empty, RunCancelled):
+                    return
+                for result in self._lookup(scraper, country, pending):
+                    results.put(result)
+
+        threads = [threading.Thread(target=worker, args=(scraper,), daemon=True) for scraper in self.scrapers]
+        for thread in threads:
+            thread.start()
+
+        # Single place where results are written into the ExcelHandler
+        failed = {}
+        for done in range(1, total + 1):
+            self._record_result(excel_handler, self._next_result(results, threads), done, total, failed)
+
+        for thread in threads:
+            thread.join()
+        return list(failed.items())
+
+    @staticmethod
+    def _lookup(scraper, country, pending):
+        """Look up a country's pending providers on one scraper and return its
+        (country, provider, value, details, scraped) results, with failed lookups as RESULT_ERROR."""
+        try:
+            values = scraper.lookup_country(country, pending)
+        except Exception as e:
+            print(f"Error processing {country} with providers {', '.join(pending)}: {e}")
+            values = {}
+        return [(country, provider, values.get(provider, RESULT_ERROR), scraper.evidence.get(provider),
+                 provider not in scraper.remembered) for provider in pending]
+
+    def _record_result(self, excel_handler, result, done, total, failed):
+        """Store one lookup result, adding it to `failed` ({country: [providers]}) if the lookup failed."""
+        country, provider, value, details, scraped = result
+        self._store_result(excel_handler, country, provider, value, details, scraped)
+        if value == RESULT_ERROR:
+            failed.setdefault(country, []).append(provider)
+        print(f"[{done}/{total}] {country} / {provider}: {value}")
+
+    def _next_result(self, results, threads):
+        """Return the next (country, provider, value, details, scraped) from the workers; raise RunCancelled if they stopped early."""
+        while True:
+            try:
+                return results.get(timeout=0.5)
+            except queue.Empty:
+                if not any(thread.is_alive() for thread in threads) and results.empty():
+                    raise RunCancelled("run cancelled")
+
+    def checkpoint(self):
+        """Wait here while the run is paused and raise RunCancelled if it was cancelled."""
+        if self.control:
+            self.control.checkpoint()
+
+    def _pending_work(self, countries, excel_handler, providers):
+        """Fill in results already known from the journal or cache and return [(country, [providers to scrape])]."""
+        work = []
+        for country in countries:
+            pending = []
+            for provider in providers:
+                value = stored_result(country, provider, self.journal, self.cache, self.manifest)
+                if value is not None:
+                    details = self.cache.get_details(country, provider) if self.cache else None
+                    excel_handler.set_provider_value(country, provider, value, details)
+                    record_result(country, provider, value, self.journal)
+                    if self.control:
+                        self.control.report(country, provider, value)
+                else:
+                    pending.append(provider)
+            if pending:
+                work.append((country, pending))
+        return work
+
+    def _store_result(self, excel_handler, country, provider, value, details=None, scraped=True):
+        """Write a result and its evidence record to the ExcelHandler and journal, and to the cache if it
+        was scraped rather than answered from memory (failed lookups to the ExcelHandler only)."""
+        excel_handler.set_provider_value(country, provider, value, details)
+        if self.control:
+            self.control.report(country, provider, value)
+        if value == RESULT_ERROR:
+            return
+        if scraped and self.cache:
+            self.cache.put(country, provider, value, details)
+        record_result(country, provider, value, self.journal)
+
+    def print_wait_summary(self):
+        """Print the wait summary of every pooled scraper."""
+        for index, scraper in enumerate(self.scrapers, start=1):
+            print(f"\nWorker {index}:", end="")
+            scraper.print_wait_summary()
+
+    def close_browser(self):
+        """Close every browser in the pool."""
+        for scraper in self.scrapers:
+            scraper.close_browser()
+        self.scrapers = []
@@ -0,0 +1,105 @@
+import threading
+import time
+
+
+def build_scraper(config, website_url, workers=None, backend=None):
+    """Create the scraper the settings ask for: the async engine, a pool of scrapers or a single one.
+
+    `workers` and `backend` override the config's values. The backend modules (Selenium,
+    requests) are only imported here, once a scraper is needed.
+    """
+    workers = workers or config.workers
+    backend = backend or config.backend
+    if config.engine == "async":
+        # Async mode: lookups run as coroutines over a few scrapers, rate limited per host
+        from async_engine import AsyncScrapeEngine
+        return AsyncScrapeEngine(website_url=website_url, backend=backend)
+    if workers > 1:
+        # Pool mode: several headless browsers share the (country, provider) work queue
+        from scraper_pool import ScraperPool
+        return ScraperPool(website_url=website_url, workers=workers, backend=backend)
+    from base_scraper import create_scraper
+    return create_scraper(backend, website_url=website_url)
+
+
+def open_scraper(scraper):
+    """Start the browsers or sessions of a scraper built by build_scraper() and load the website."""
+    if hasattr(scraper, "start"):
+        scraper.start()
+    else:
+        scraper.open_website()
+
+
+class ScraperWarmup:
+    def __init__(self, config):
+        """Initialize the background start of the scraper while the run settings are still being entered.
+
+        Launching Chrome and loading the website is the slowest part of getting to the first
+        lookup. start() does it in a daemon thread as soon as the program starts, and take()
+        hands the ready scraper to the run (pointing it at another URL if the user changed it).
+
+        Args:
+          - config: The shared Config, which decides the engine, worker count and backend.
+        """
+        self.config = config
+        self.website_url = None
+        self.scraper = None
+        self.error = None
+        self.seconds = None  # How long the warm-up took
+        self._thread = None
+
+    def start(self, website_url=None):
+        """Build and open the scraper in a background thread."""
+        self.website_url = website_url or self.config.website_url
+        self._thread = threading.Thread(target=self._warm, name="scraper-warmup", daemon=True)
+        self._thread.start()
+
+    def _warm(self):
+        started = time.perf_counter()
+        try:
+            scraper = build_scraper(self.config, self.website_url)
+            try:
+                open_scraper(scraper)
+            except Exception:
+                scraper.close_browser()
+                raise
+            self.scraper = scraper
+        except Exception as e:
+            self.error = e
+            print(f"Warning: could not start the scraper in the background ({e}); it will be started with the run.")
+        self.seconds = time.perf_counter() - started
+
+    def take(self, website_url):
+        """Wait for the warm-up and return its scraper, or None if it failed or was never started.
+
+        The scraper is handed over once; if `website_url` differs from the one it was warmed
+        up with, the website is loaded again at the new address.
+        """
+        if self._thread is None:
+            return None
+        self._thread.join()
+        scraper, self.scraper = self.scraper, None
+        if scraper is None:
+            return None
+        if website_url != self.website_url:
+            pooled_scrapers = getattr(scraper, "scrapers", None)
+            if pooled_scrapers is not None:
+                scraper.website_url = website_url
+            try:
+                for pooled in pooled_scrapers or [scraper]:
+                    pooled.document_checklist_website = website_url
+                    pooled.open_website()
+            except Exception:
+                scraper.close_browser()
+                raise
+        print(f"Using the scraper started in the background ({self.seconds:.1f}s warm-up).")
+        return scraper
+
+    def discard(self):
+        """Close the warmed-up scraper if the run never took it (e.g. the user cancelled)."""
+        if self._thread is None:
+            return
+        self._thread.join()
+        if self.scraper is not None:
+            self.scraper.close_browser()
+            self.scraper = None
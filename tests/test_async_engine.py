@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from async_engine import AsyncScrapeEngine
+from base_scraper import BaseScraper
+from result_store import ResultStore
+from run_control import RunCancelled, RunControl
+
+COUNTRIES = [f"Country {index}" for index in range(12)]
+PROVIDERS = ["Newcastle", "Peach"]
+
+
+class SlowScraper(BaseScraper):
+    """Answers every lookup with 'N' after a short wait, recording the countries it looked up."""
+
+    lookups = []
+    lock = threading.Lock()
+
+    def __init__(self):
+        super().__init__()
+        self.recycler = None
+
+    def open_website(self):
+        pass
+
+    def close_browser(self):
+        pass
+
+    def check_country_providers(self, country, providers):
+        with self.lock:
+            self.lookups.append(country)
+        time.sleep(0.02)
+        self.fingerprints, self.evidence = {}, {}
+        return {provider: "N" for provider in providers}
+
+
+class Sheet:
+    """Stands in for ExcelHandler."""
+
+    def __init__(self):
+        self.results = ResultStore(COUNTRIES, PROVIDERS)
+
+    def set_provider_value(self, country, provider, value, details=None):
+        self.results.set(country, provider, value, details)
+
+
+class CancelAfter(RunControl):
+    """Cancels the run once `count` results have been stored."""
+
+    def __init__(self, count):
+        super().__init__()
+        self.count = count
+        self.stored = 0
+
+    def report(self, country, provider, value):
+        super().report(country, provider, value)
+        self.stored += 1
+        if self.stored == self.count:
+            self.cancel()
+
+
+def engine(control=None):
+    SlowScraper.lookups = []
+    pool = AsyncScrapeEngine(contexts=3, rate_per_second=0, scraper_factory=lambda index: SlowScraper())
+    pool.control = control
+    return pool
+
+
+def test_all_pairs_are_looked_up_once():
+    pool, sheet = engine(), Sheet()
+    pool.process_all_providers(COUNTRIES, sheet, PROVIDERS)
+    assert sorted(SlowScraper.lookups) == sorted(COUNTRIES)
+    assert sheet.results.errors() == [] and all(sheet.results.row(country) == ["N", "N"] for country in COUNTRIES)
+
+
+def test_cancel_stops_queued_lookups_before_the_run_returns():
+    pool, sheet = engine(CancelAfter(4)), Sheet()
+    with pytest.raises(RunCancelled):
+        pool.process_all_providers(COUNTRIES, sheet, PROVIDERS)
+    looked_up = len(SlowScraper.lookups)
+    # Only the lookups already holding a context when the run was cancelled went ahead
+    assert looked_up <= 2 + len(pool.scrapers)
+    time.sleep(0.1)
+    assert len(SlowScraper.lookups) == looked_up
+
+
+def test_paused_run_holds_lookups_until_resumed():
+    control = RunControl()
+    pool, sheet = engine(control), Sheet()
+    control.pause()
+    runner = threading.Thread(target=pool.process_all_providers, args=(COUNTRIES, sheet, PROVIDERS))
+    runner.start()
+    time.sleep(0.2)
+    assert SlowScraper.lookups == []
+    control.resume()
+    runner.join(timeout=5)
+    assert sorted(SlowScraper.lookups) == sorted(COUNTRIES)
@@ -0,0 +1,50 @@
+from evidence_parser import RISK_LEVEL_PATTERN, parse_evidence
+
+PAGE = """
+<html><body>
+  <h3>Unrelated page heading</h3>
+  <div id="results">
+    <h3>Financial capacity</h3>
+    <p>Evidence of funds for the stay.</p>
+    <h3>English language <b>ability</b></h3>
+    <ul><li>Country risk level: 3</li><li>Provider Assessment Level 2</li></ul>
+  </div>
+</body></html>
+"""
+
+
+def levels(text):
+    return parse_evidence(f"<p>{text}</p>")["risk_levels"]
+
+
+def test_headings_are_read_from_the_results_container_only():
+    record = parse_evidence(PAGE, "results")
+    assert record["categories"] == ["Financial capacity", "English language ability"]
+    assert record["risk_levels"] == {"country": 3, "provider": 2}
+
+
+def test_whole_page_is_parsed_when_the_container_is_missing():
+    record = parse_evidence(PAGE, "no-such-id")
+    assert record["categories"] == ["Unrelated page heading", "Financial capacity", "English language ability"]
+    assert record == parse_evidence(PAGE)
+
+
+def test_risk_level_pattern_reads_the_label_and_level():
+    assert levels("Country risk level: 2") == {"country": 2}
+    assert levels("Provider Assessment Level 1") == {"provider": 1}
+    assert levels("Risk rating - 3") == {"risk": 3}
+    assert levels("Passport country  risk level 2") == {"passport country": 2}
+    assert levels("No risk levels are shown") == {}
+    assert RISK_LEVEL_PATTERN.search("Assessment rating:4").group(2) == "4"
+
+
+def test_page_hash_follows_the_text_not_the_markup():
+    plain = parse_evidence("<div id='results'><h3>Financial capacity</h3></div>", "results")
+    styled = parse_evidence("<div id='results'><h3><span>Financial</span> capacity</h3></div>", "results")
+    other = parse_evidence("<div id='results'><h3>Genuine student</h3></div>", "results")
+    assert plain["page_hash"] == styled["page_hash"]
+    assert plain["page_hash"] != other["page_hash"]
+
+
+def test_a_page_without_evidence_has_no_categories():
+    assert parse_evidence("<div id='results'></div>", "results")["categories"] == []
@@ -0,0 +1,98 @@
+import json
+
+from fixture_server import FixtureServer
+from http_scraper import HttpScraper
+from name_resolver import NameResolver, normalise
+
+COUNTRIES = {"Canada": "Canada", "India": "India", "USA": "United States of America", "Vietnam": "Vietnam"}
+PROVIDERS = ["University of Newcastle", "Peach University"]
+
+
+def option_lists(countries, providers=()):
+    return lambda: {"countries": [(str(index), name) for index, name in enumerate(countries, 1)],
+                    "providers": [(str(index), name) for index, name in enumerate(providers, 1)]}
+
+
+def resolver(tmp_path, countries=(), providers=(), aliases=None):
+    aliases_path = None
+    if aliases is not None:
+        aliases_path = str(tmp_path / "aliases.json")
+        with open(aliases_path, "w", encoding="utf-8") as aliases_file:
+            json.dump(aliases, aliases_file)
+    return NameResolver(index_path=str(tmp_path / "name_index.json"), aliases_path=aliases_path,
+                        website_url="http://live.example/tool").load_or_build(option_lists(countries, providers))
+
+
+def test_normalise_ignores_accents_case_punctuation_and_the():
+    assert normalise("  Côte d'Ivoire ") == "cote divoire"
+    assert normalise("The Gambia") == "gambia"
+    assert normalise("Korea, South") == normalise("korea south")
+    assert normalise("Trinidad & Tobago") == "trinidad and tobago"
+
+
+def test_names_resolve_exactly_then_by_alias(tmp_path):
+    names = resolver(tmp_path, ["United States of America", "Korea, South", "Viet Nam"])
+    assert names.resolve("korea south") == (("2", "Korea, South"), "exact")
+    assert names.resolve("USA") == (("1", "United States of America"), "alias")
+    assert names.resolve("Vietnam") == (("3", "Viet Nam"), "alias")
+
+
+def test_aliases_file_adds_spreadsheet_spellings(tmp_path):
+    names = resolver(tmp_path, ["Hong Kong SAR of China"], aliases={"HK": "Hong Kong SAR of China"})
+    assert names.resolve("HK") == (("1", "Hong Kong SAR of China"), "alias")
+
+
+def test_fuzzy_matching_takes_close_spellings_and_unique_provider_names(tmp_path):
+    names = resolver(tmp_path, ["Philippines", "Argentina"],
+                     ["University of Newcastle (00109J)", "Peach University (01234A)", "Peach University College"])
+    assert names.resolve("Phillipines") == (("1", "Philippines"), "fuzzy")
+    assert names.resolve("Newcastle", "providers") == (("1", "University of Newcastle (00109J)"), "fuzzy")
+    assert names.resolve("Peach University", "providers") == (None, None)  # Two options contain the name
+    assert names.resolve("Atlantis") == (None, None)
+
+
+def test_resolve_all_leaves_out_names_that_do_not_match(tmp_path):
+    names = resolver(tmp_path, ["Canada", "India"])
+    assert names.resolve_all(["Canada", "Atlantis"], report=False) == {"Canada": ("1", "Canada")}
+
+
+def test_index_keeps_one_entry_per_website(tmp_path):
+    path = str(tmp_path / "name_index.json")
+    NameResolver(index_path=path, website_url="http://live.example/tool").load_or_build(option_lists(["Canada", "India"]))
+    NameResolver(index_path=path, website_url="http://127.0.0.1:8000/tool").load_or_build(option_lists(["India", "Canada"]))
+
+    def fail():
+        raise AssertionError("the cached index should have been used")
+
+    live = NameResolver(index_path=path, website_url="http://live.example/tool").load_or_build(fail)
+    assert live.resolve("Canada") == (("1", "Canada"), "exact")
+    with open(path, encoding="utf-8") as index_file:
+        assert set(json.load(index_file)) == {"http://live.example/tool", "http://127.0.0.1:8000/tool"}
+
+
+def test_reordered_dropdown_rebuilds_the_index_and_selects_by_text(tmp_path):
+    with FixtureServer() as server:
+        resolver = NameResolver(index_path=str(tmp_path / "name_index.json"), website_url=server.url)
+        scraper = HttpScraper(website_url=server.url)
+        try:
+            scraper.open_website()
+            resolver.load_or_build(scraper.fetch_option_lists)
+            scraper.set_resolved_options(resolver.resolve_all(list(COUNTRIES), "countries", report=False),
+                                         resolver.resolve_all(PROVIDERS, "providers", report=False), resolver)
+            stale = scraper.resolved_options["countries"]["Canada"]
+
+            # The site adds a country at the top, shifting every option value by one
+            server.countries = {"Aland Islands": 1, **server.countries}
+            scraper.open_website()
+            results = {country: scraper.check_country_providers(country, PROVIDERS) for country in COUNTRIES}
+        finally:
+            scraper.close_browser()
+
+        assert results == {
+            country: {provider: "Y" if server.evidence_required(text, provider) else "N" for provider in PROVIDERS}
+            for country, text in COUNTRIES.items()
+        }
+    rebuilt = scraper.resolved_options["countries"]["Canada"]
+    assert rebuilt[1] == stale[1] and rebuilt[0] != stale[0]
+    assert NameResolver(index_path=str(tmp_path / "name_index.json"), website_url=server.url) \
+        .load_or_build(option_lists([])).resolve("Canada")[0] == rebuilt
@@ -0,0 +1,51 @@
+from query_server import QueryService
+from result_cache import ResultCache
+
+
+class UnreachableScraper:
+    """Fails to load the website, counting the attempts."""
+
+    attempts = 0
+
+    def open_website(self):
+        UnreachableScraper.attempts += 1
+        raise ConnectionError("website unreachable")
+
+    def close_browser(self):
+        pass
+
+
+def service(tmp_path, retry_after):
+    UnreachableScraper.attempts = 0
+    cache = ResultCache(path=str(tmp_path / "cache.sqlite3"), ttl_days=7, rule_snapshot="test")
+    return QueryService(cache=cache, website_url="http://127.0.0.1:1/tool",
+                        scraper_factory=UnreachableScraper, retry_after=retry_after)
+
+
+def test_failed_lookup_is_answered_with_an_error_status(tmp_path):
+    queries = service(tmp_path, retry_after=300)
+    try:
+        missing, = queries.query([("India", "Peach")])
+        failed, = queries.query([("India", "Peach")], wait=True, timeout=5)
+    finally:
+        queries.close()
+    assert missing["status"] == "missing" and missing["failed_at"] is None
+    assert failed["status"] == "error" and failed["value"] is None
+    assert failed["failed_at"] is not None and not failed["pending"]
+
+
+def test_failed_pair_is_not_looked_up_again_until_retry_after(tmp_path):
+    queries = service(tmp_path, retry_after=300)
+    try:
+        queries.query([("India", "Peach")], wait=True, timeout=5)
+        for _ in range(5):
+            record, = queries.query([("India", "Peach")], wait=True, timeout=5)
+            assert record["status"] == "error" and not record["pending"]
+        assert UnreachableScraper.attempts == 1
+
+        queries.retry_after = 0
+        queries.query([("India", "Peach")], wait=True, timeout=5)
+        assert UnreachableScraper.attempts == 2
+    finally:
+        queries.close()
+    assert queries.stats["errors"] == 2
@@ -0,0 +1,66 @@
+import pytest
+
+from result_store import ResultStore
+
+COUNTRIES = ["Canada", "India", "Kenya", "Vietnam"]
+PROVIDERS = ["Newcastle", "Peach"]
+
+
+def filled(values):
+    """A store with {(country, provider): value} set and every other cell unknown."""
+    store = ResultStore(COUNTRIES, PROVIDERS)
+    for (country, provider), value in values.items():
+        store.set(country, provider, value)
+    return store
+
+
+def test_cells_start_unknown_and_keep_their_value():
+    store = filled({("India", "Peach"): "Y", ("Canada", "Peach"): "N", ("Kenya", "Newcastle"): "ERROR"})
+    assert store.get("India", "Peach") == "Y"
+    assert store.get("Canada", "Peach") == "N"
+    assert store.get("Kenya", "Newcastle") == "ERROR"
+    assert store.get("Vietnam", "Peach") is None
+    assert store.get("Vietnam", "Peach", default="") == ""
+    assert store.row("India", default="-") == ["-", "Y"]
+
+
+def test_columns_are_one_byte_per_country():
+    store = filled({})
+    assert all(isinstance(column, bytearray) and len(column) == len(COUNTRIES) for column in store._columns)
+    store.add_country("Japan")
+    store.add_provider("Example")
+    assert [len(column) for column in store._columns] == [len(COUNTRIES) + 1] * 3
+    assert store.add_country("Canada") == 0  # An existing country keeps its row
+
+
+def test_unknown_names_and_values_raise_key_error():
+    store = filled({})
+    with pytest.raises(KeyError):
+        store.set("Atlantis", "Peach", "Y")
+    with pytest.raises(KeyError):
+        store.set("Canada", "Peach", "maybe")
+
+
+def test_differing_skips_unknown_and_failed_cells():
+    store = filled({
+        ("Canada", "Newcastle"): "N", ("Canada", "Peach"): "N",
+        ("India", "Newcastle"): "N", ("India", "Peach"): "Y",
+        ("Kenya", "Newcastle"): "ERROR", ("Kenya", "Peach"): "Y",
+        ("Vietnam", "Peach"): "Y",
+    })
+    assert store.differing("Newcastle", "Peach") == ["India"]
+    assert store.differing("Peach", "Newcastle") == ["India"]
+
+
+def test_errors_lists_failed_pairs_provider_by_provider():
+    store = filled({("Kenya", "Newcastle"): "ERROR", ("Canada", "Peach"): "ERROR", ("India", "Peach"): "Y"})
+    assert store.errors() == [("Kenya", "Newcastle"), ("Canada", "Peach")]
+    assert store.counts()["Peach"] == {"unknown": 2, "N": 0, "Y": 1, "ERROR": 1}
+
+
+def test_details_are_dropped_when_a_pair_is_set_without_them():
+    store = filled({})
+    store.set("India", "Peach", "Y", {"categories": ["Financial capacity"]})
+    assert store.get_details("India", "Peach") == {"categories": ["Financial capacity"]}
+    store.set("India", "Peach", "N")
+    assert store.get_details("India", "Peach") is None
@@ -0,0 +1,71 @@
+import csv
+
+from run_manifest import RunManifest
+
+COUNTRIES = ["Canada", "India", "Kenya"]
+PROVIDERS = ["Newcastle", "Peach"]
+RESULTS = {
+    "Canada": {"Newcastle": "N", "Peach": "N"},
+    "India": {"Newcastle": "Y", "Peach": "Y"},
+    "Kenya": {"Newcastle": "ERROR", "Peach": "Y"},
+}
+
+
+def saved(tmp_path, sample_size=2, rule_snapshot="test", countries=COUNTRIES, results=RESULTS):
+    """Path of a manifest saved by a first run."""
+    path = str(tmp_path / "run_manifest.json")
+    first = RunManifest(path=path, sample_size=sample_size, rule_snapshot=rule_snapshot)
+    first.plan(countries, PROVIDERS)
+    first.save(countries, PROVIDERS, results)
+    return path
+
+
+def test_first_run_looks_up_every_pair(tmp_path):
+    manifest = RunManifest(path=str(tmp_path / "run_manifest.json"), sample_size=2, rule_snapshot="test")
+    manifest.plan(COUNTRIES, PROVIDERS)
+    assert manifest.carried == {} and manifest.sampled == set()
+
+
+def test_known_pairs_are_carried_forward_except_the_sample(tmp_path):
+    manifest = RunManifest(path=saved(tmp_path), sample_size=2, rule_snapshot="test")
+    manifest.plan(COUNTRIES + ["Vietnam"], PROVIDERS)
+    known = {(country, provider) for country, values in RESULTS.items()
+             for provider, value in values.items() if value in ("Y", "N")}
+    assert len(manifest.sampled) == 2
+    assert set(manifest.carried) == known - manifest.sampled
+    assert manifest.get("Kenya", "Newcastle") is None  # Failed lookups are retried
+    assert manifest.get("Vietnam", "Peach") is None  # New countries are looked up
+
+
+def test_sample_rolls_over_the_old_pairs_from_run_to_run(tmp_path):
+    path = saved(tmp_path)
+    sampled = []
+    for _ in range(3):
+        manifest = RunManifest(path=path, sample_size=2, rule_snapshot="test")
+        manifest.plan(COUNTRIES, PROVIDERS)
+        sampled.append(manifest.sampled)
+        manifest.save(COUNTRIES, PROVIDERS, RESULTS)
+    assert sampled[0] != sampled[1]
+    assert len(sampled[0] | sampled[1]) == 4  # Every known pair re-checked within two runs
+
+
+def test_results_under_another_rule_snapshot_are_not_carried(tmp_path):
+    manifest = RunManifest(path=saved(tmp_path, rule_snapshot="2025"), sample_size=2, rule_snapshot="2026")
+    manifest.plan(COUNTRIES, PROVIDERS)
+    assert manifest.carried == {} and manifest.sampled == set()
+
+
+def test_changelog_lists_flipped_and_removed_pairs(tmp_path):
+    manifest = RunManifest(path=saved(tmp_path, sample_size=0), sample_size=0, rule_snapshot="test")
+    manifest.plan(["Canada", "India"], PROVIDERS)
+    path = str(tmp_path / "changelog.csv")
+    changes = manifest.write_changelog({
+        "Canada": {"Newcastle": "N", "Peach": "Y"},
+        "India": {"Newcastle": "Y", "Peach": "ERROR"},  # A failed lookup is not a change
+    }, path)
+    assert changes == [("Canada", "Peach", "N", "Y", "new"),
+                       ("Kenya", "Newcastle", "ERROR", "", "removed"), ("Kenya", "Peach", "Y", "", "removed")]
+    with open(path, newline="", encoding="utf-8") as changelog:
+        rows = list(csv.reader(changelog))
+    assert rows[0] == ["Country", "Provider", "Previous", "Current", "Checked as"]
+    assert rows[1] == ["Canada", "Peach", "N", "Y", "new"]
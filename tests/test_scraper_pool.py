@@ -0,0 +1,43 @@
+import pytest
+
+from base_scraper import BaseScraper
+from scraper_pool import ScraperPool
+
+
+class StartingScraper(BaseScraper):
+    """Records whether it was closed; fails to load the website if `fails` is set."""
+
+    def __init__(self, fails=False):
+        super().__init__()
+        self.recycler = None
+        self.fails = fails
+        self.closed = False
+
+    def open_website(self):
+        if self.fails:
+            raise ConnectionError("website unreachable")
+
+    def close_browser(self):
+        self.closed = True
+
+
+def test_failed_start_closes_every_scraper_it_created():
+    created = []
+
+    def factory(index):
+        created.append(StartingScraper(fails=index == 2))
+        return created[-1]
+
+    pool = ScraperPool(workers=4, scraper_factory=factory)
+    with pytest.raises(ConnectionError):
+        pool.start()
+    assert len(created) == 4 and all(scraper.closed for scraper in created)
+    assert pool.scrapers == []
+
+
+def test_started_pool_keeps_its_scrapers_open():
+    pool = ScraperPool(workers=3, scraper_factory=lambda index: StartingScraper())
+    pool.start()
+    assert len(pool.scrapers) == 3 and not any(scraper.closed for scraper in pool.scrapers)
+    pool.close_browser()
+    assert pool.scrapers == []
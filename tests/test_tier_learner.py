@@ -0,0 +1,155 @@
+import json
+
+from base_scraper import BaseScraper
+from result_cache import ResultCache
+from result_store import ResultStore
+from tier_learner import TierLearner, country_risk_level
+
+# Fixture-style world: evidence is required when country level + provider level >= 4
+COUNTRY_LEVELS = {"Canada": 1, "France": 1, "Japan": 1, "Brazil": 2, "China": 2, "Vietnam": 2, "India": 3, "Kenya": 3}
+PROVIDER_LEVELS = {"Newcastle": 1, "Peach": 2}
+
+
+def outcome(country, provider):
+    return "Y" if COUNTRY_LEVELS[country] + PROVIDER_LEVELS[provider] >= 4 else "N"
+
+
+def page(country, provider, show_levels=True):
+    """(fingerprint, risk_levels) of the fixture evidence page for a pair."""
+    value = outcome(country, provider)
+    risk_levels = {"country": COUNTRY_LEVELS[country], "provider": PROVIDER_LEVELS[provider]} if show_levels else {}
+    return f"fp-{value}", risk_levels
+
+
+class FixtureScraper(BaseScraper):
+    """Answers lookups from the fixture rules and counts them, without a website."""
+
+    def __init__(self, show_levels=True):
+        super().__init__()
+        self.recycler = None
+        self.show_levels = show_levels
+        self.lookups = []
+
+    def check_country_providers(self, country, providers):
+        self.fingerprints, self.evidence = {}, {}
+        results = {}
+        for provider in providers:
+            self.lookups.append((country, provider))
+            fingerprint, risk_levels = page(country, provider, self.show_levels)
+            results[provider] = outcome(country, provider)
+            self.fingerprints[provider] = fingerprint
+            self.evidence[provider] = {"categories": [], "risk_levels": risk_levels, "page_hash": f"{country}/{provider}"}
+        return results
+
+
+class Sheet:
+    """Stands in for ExcelHandler."""
+
+    def __init__(self, countries, providers):
+        self.results = ResultStore(countries, providers)
+
+    def set_provider_value(self, country, provider, value, details=None):
+        self.results.set(country, provider, value, details)
+
+
+def run(provider, learner, cache=None, show_levels=True):
+    scraper = FixtureScraper(show_levels)
+    scraper.tier_learner = learner
+    scraper.cache = cache
+    sheet = Sheet(list(COUNTRY_LEVELS), [provider])
+    scraper.process_all_providers(list(COUNTRY_LEVELS), sheet, [provider])
+    return scraper, sheet
+
+
+def test_country_risk_level_reads_the_country_label():
+    assert country_risk_level({"provider": 2, "country": 3}) == "3"
+    assert country_risk_level({"passport country": 1}) == "1"
+    assert country_risk_level({"provider": 2}) is None
+    assert country_risk_level(None) is None
+
+
+def test_tier_is_answered_from_memory_only_after_confirmations():
+    learner = TierLearner(tiers={"Canada": 1, "France": 1, "Japan": 1}, path="unused.json", confirm_after=2, verify_every=10)
+    assert learner.answer("Canada", "Peach") is None
+    learner.observe("Canada", "Peach", "fp-N", "N")
+    assert learner.answer("France", "Peach") is None
+    learner.observe("France", "Peach", "fp-N", "N")
+    assert learner.answer("Japan", "Peach") == "N"
+    assert learner.answer("Japan", "Newcastle") is None  # Outcomes are per provider
+
+
+def test_every_nth_remembered_answer_is_verified_live():
+    learner = TierLearner(tiers={country: 1 for country in "ABCDEF"}, path="unused.json", confirm_after=1, verify_every=3)
+    learner.observe("A", "P", "fp", "N")
+    answers = [learner.answer(country, "P") for country in "BCDEF"]
+    assert answers == ["N", "N", None, "N", "N"]
+    assert learner.stats["verified"] == 1
+
+
+def test_conflicting_lookup_switches_the_tier_back_to_live():
+    learner = TierLearner(tiers={"A": 1, "B": 1, "C": 1, "D": 1}, path="unused.json", confirm_after=1, verify_every=100)
+    learner.observe("A", "P", "fp-N", "N")
+    assert learner.answer("B", "P") == "N"
+    learner.observe("C", "P", "fp-Y", "Y")
+    assert learner.stats["conflicts"] == 1
+    assert learner.answer("D", "P") is None
+
+
+def test_countries_without_a_known_risk_level_are_always_looked_up(tmp_path):
+    path = str(tmp_path / "country_tiers.json")
+    learner = TierLearner(path=path, confirm_after=1)
+    scraper, sheet = run("Newcastle", learner, show_levels=False)
+    assert len(scraper.lookups) == len(COUNTRY_LEVELS)
+    learner.save_learned()
+    assert not (tmp_path / "country_tiers.json").exists()  # Same answers do not make a tier
+
+
+def test_learned_risk_levels_give_correct_answers_for_another_provider(tmp_path):
+    """A table learned while checking one provider must not mix up countries of different levels
+    for a provider whose answers split the levels differently."""
+    path = str(tmp_path / "country_tiers.json")
+    first = TierLearner(path=path, confirm_after=1)
+    run("Newcastle", first)  # Only level 3 countries need evidence for a level 1 provider
+    first.save_learned()
+    with open(path, encoding="utf-8") as tiers_file:
+        assert json.load(tiers_file) == {country: str(level) for country, level in COUNTRY_LEVELS.items()}
+
+    second = TierLearner(path=path, confirm_after=1, verify_every=100)
+    scraper, sheet = run("Peach", second)
+    assert {country: sheet.results.get(country, "Peach") for country in COUNTRY_LEVELS} == \
+        {country: outcome(country, "Peach") for country in COUNTRY_LEVELS}
+    assert second.stats["remembered"] > 0
+    assert len(scraper.lookups) < len(COUNTRY_LEVELS)
+
+
+def test_save_learned_keeps_the_imported_table(tmp_path):
+    path = tmp_path / "country_tiers.csv"
+    path.write_text("Canada,1\n", encoding="utf-8")
+    learner = TierLearner(path=str(path))
+    learner.observe("India", "Peach", "fp-Y", "Y", {"country": 3})
+    learner.observe("Canada", "Peach", "fp-N", "N", {"country": 2})  # The imported level wins
+    learner.save_learned()
+    assert TierLearner.load_tiers(str(path)) == {"Canada": "1", "India": "3"}
+
+
+def test_answers_from_memory_are_not_cached(tmp_path):
+    cache = ResultCache(path=str(tmp_path / "cache.sqlite3"), ttl_days=7, rule_snapshot="test")
+    learner = TierLearner(tiers=COUNTRY_LEVELS, path="unused.json", confirm_after=1, verify_every=100)
+    try:
+        scraper, sheet = run("Peach", learner, cache=cache)
+        cached = {country for country, _, _, _ in cache.entries()}
+    finally:
+        cache.close()
+    assert cached == {country for country, _ in scraper.lookups}
+    assert len(cached) < len(COUNTRY_LEVELS)
+
+
+def test_answers_from_memory_do_not_reuse_an_earlier_evidence_record():
+    learner = TierLearner(tiers=COUNTRY_LEVELS, path="unused.json", confirm_after=1, verify_every=100)
+    scraper, sheet = run("Peach", learner)
+    for country in COUNTRY_LEVELS:
+        details = sheet.results.get_details(country, "Peach")
+        if (country, "Peach") in scraper.lookups:
+            assert details["page_hash"] == f"{country}/Peach"
+        else:
+            assert details == {"source": "tier"}
@@ -0,0 +1,121 @@
+import csv
+import json
+import os
+import threading
+
+from config import load_config
+
+
+def country_risk_level(risk_levels):
+    """Return the country risk level from an evidence record's risk levels as a tier label, or None."""
+    for label, level in (risk_levels or {}).items():
+        if "country" in label or "passport" in label:
+            return str(level)
+    return None
+
+
+class TierLearner:
+    def __init__(self, tiers=None, path=None, confirm_after=None, verify_every=None):
+        """Initialize the layer answering lookups from the country's risk tier once its outcome is known.
+
+        For a fixed provider the evidence page depends on the country's risk tier, not the country
+        itself. Once `confirm_after` live lookups in a tier have rendered the same evidence
+        section (same fingerprint) for a provider, the rest of that tier is answered from memory,
+        except every `verify_every`-th country, which is still looked up live. A live lookup that
+        disagrees with the remembered outcome switches the tier back to live lookups for that provider.
+
+        A country's tier is its risk level: taken from the imported table, or else from the
+        country risk level shown on its evidence page (see evidence_parser). Countries with
+        neither are always looked up live. Tiers are never derived from lookup outcomes, which
+        only say which countries gave the same answers for the providers checked so far.
+
+        Args:
+          - tiers: Dict of country -> tier label; without it the table is read from `path`.
+          - path: CSV (country,tier) or JSON ({country: tier}) tier table (falls back to
+            COUNTRY_TIERS_PATH, then country_tiers.json). save_learned() adds the risk levels
+            read from evidence pages during this run to it.
+          - confirm_after: Matching live lookups needed before a tier is answered from memory (TIER_CONFIRM_AFTER, default 2).
+          - verify_every: Every n-th remembered answer per tier and provider is verified live (TIER_VERIFY_EVERY, default 10).
+        """
+        config = load_config()
+        self.path = path or config.get("COUNTRY_TIERS_PATH", "country_tiers.json")
+        self.confirm_after = int(confirm_after or config.get("TIER_CONFIRM_AFTER", "2"))
+        self.verify_every = int(verify_every or config.get("TIER_VERIFY_EVERY", "10"))
+        self.tiers = {country: str(tier) for country, tier in (tiers if tiers is not None else self.load_tiers(self.path)).items()}
+        self.outcomes = {}       # (tier, provider) -> {"fingerprint", "value", "confirmations", "conflict", "asked"}
+        self.learned = {}        # country -> risk level read from its evidence page, for countries not in the table
+        self.stats = {"remembered": 0, "verified": 0, "live": 0, "conflicts": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load_tiers(path):
+        """Read a country -> tier table from a .csv or .json file; an absent file gives an empty table."""
+        if not os.path.exists(path):
+            return {}
+        with open(path, newline="", encoding="utf-8") as tiers_file:
+            if path.lower().endswith(".csv"):
+                return {row[0].strip(): row[1].strip() for row in csv.reader(tiers_file) if len(row) >= 2 and row[0].strip()}
+            return {country: str(tier) for country, tier in json.load(tiers_file).items()}
+
+    def answer(self, country, provider):
+        """Return the remembered value for a pair, or None if it must be looked up live."""
+        tier = self.tiers.get(country)
+        with self._lock:
+            outcome = self.outcomes.get((tier, provider))
+            if tier is None or outcome is None or outcome["conflict"] or outcome["confirmations"] < self.confirm_after:
+                self.stats["live"] += 1
+                return None
+            outcome["asked"] += 1
+            if outcome["asked"] % self.verify_every == 0:
+                self.stats["verified"] += 1
+                return None
+            self.stats["remembered"] += 1
+            return outcome["value"]
+
+    def observe(self, country, provider, fingerprint, value, risk_levels=None):
+        """Learn from a live lookup: confirm the tier's outcome for the provider, or flag a conflict.
+
+        Args:
+          - risk_levels: The {label: level} risk levels shown on the evidence page; a country
+            missing from the tier table is placed in the tier of its country risk level.
+        """
+        if fingerprint is None:
+            return
+        level = country_risk_level(risk_levels)
+        with self._lock:
+            if country not in self.tiers and level is not None:
+                self.tiers[country] = self.learned[country] = level
+            tier = self.tiers.get(country)
+            if tier is None:
+                return
+            outcome = self.outcomes.setdefault((tier, provider), {
+                "fingerprint": fingerprint, "value": value, "confirmations": 0, "conflict": False, "asked": 0})
+            if outcome["conflict"]:
+                return
+            if outcome["fingerprint"] == fingerprint and outcome["value"] == value:
+                outcome["confirmations"] += 1
+            else:
+                outcome["conflict"] = True
+                self.stats["conflicts"] += 1
+                print(f"Tier '{tier}' gave different evidence for {provider} ({country}); "
+                      f"looking up the rest of the tier live.")
+
+    def save_learned(self):
+        """Add the country risk levels read from evidence pages this run to the tier table at `path`."""
+        with self._lock:
+            if not self.learned:
+                return
+            table = self.load_tiers(self.path)
+            table.update(self.learned)
+        with open(self.path, "w", newline="", encoding="utf-8") as tiers_file:
+            if self.path.lower().endswith(".csv"):
+                csv.writer(tiers_file).writerows(sorted(table.items()))
+            else:
+                json.dump(table, tiers_file, indent=1, sort_keys=True)
+        print(f"Read the risk level of {len(self.learned)} countries from their evidence pages; saved to {self.path}")
+
+    def print_summary(self):
+        """Print how many lookups were answered from memory, verified or looked up live."""
+        stats = self.stats
+        print(f"\nTier dedup: {stats['remembered']} answered from memory, {stats['verified']} verified live, "
+              f"{stats['live']} other live lookups, {stats['conflicts']} tier conflicts")
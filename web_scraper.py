@@ -3,162 +3,350 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from dotenv import load_dotenv
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 import os
 import time
 
-class WebScraper:
-    def __init__(self, website_url=None):
-        """Initialize the web scraper by loading environment variables and setting up the browser."""
-        load_dotenv()  # Load environment variables
+from base_scraper import BaseScraper
+from browser_recycler import process_tree_rss_mb
+from config import load_config
+from evidence_parser import parse_evidence
+from instrumentation import timed_step
+from retry_policy import PermanentStepError
+
+# Default explicit-wait timeouts (seconds) for each step of the evidence lookup
+DEFAULT_WAIT_TIMEOUTS = {
+    "dropdown_open": 5,     # select2 search box becomes usable after clicking the dropdown
+    "search_results": 5,    # select2 results list is filled in for the typed search term
+    "selection": 5,         # select2 dropdown closes after a result is chosen
+    "radio": 5,             # radio option '01' is enabled and clickable
+    "evidence": 15,         # evidence <h3> section is replaced after btnSubmitEvidence
+}
+
+# URL patterns the browser never needs to fetch to answer an evidence lookup
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*hotjar.com*", "*facebook.net*", "*clarity.ms*", "*newrelic.com*", "*nr-data.net*",
+]
+
+# Sets a native <select> behind a select2 widget to an option value and lets select2 know;
+# returns null without changing it if that value is missing or now has a different text
+SELECT_BY_VALUE_SCRIPT = """
+var select = document.getElementById(arguments[0]), value = arguments[1], text = arguments[2];
+var option = Array.prototype.find.call(select.options, function (option) { return option.value === value; });
+if (!option || option.text.trim() !== text) { return null; }
+select.value = value;
+if (window.jQuery) { window.jQuery(select).trigger('change'); }
+else { select.dispatchEvent(new Event('change', {bubbles: true})); }
+return select.value;
+"""
+
+# Reads every option of a native <select> as [value, text]
+OPTION_LIST_SCRIPT = """
+var select = document.getElementById(arguments[0]);
+if (!select) { return []; }
+return Array.prototype.map.call(select.options, function (option) { return [option.value, option.text.trim()]; });
+"""
+
+# Returns the HTML of the evidence results container, or of the whole body if it is not on the page
+EVIDENCE_HTML_SCRIPT = """
+var container = document.getElementById(arguments[0]) || document.body;
+return container.outerHTML;
+"""
+
+# Puts a hidden marker into the results container (or the body) before a postback and returns
+# the container's content, so the reply can be told apart from the page it replaces
+MARK_POSTBACK_SCRIPT = """
+var container = document.getElementById(arguments[0]) || document.body;
+var marker = document.createElement('span');
+marker.id = 'crs-postback-marker';
+marker.style.display = 'none';
+container.appendChild(marker);
+return container.innerHTML;
+"""
+
+# True once the postback has replaced the page (marker gone) or changed the container's content
+POSTBACK_DONE_SCRIPT = """
+if (!document.getElementById('crs-postback-marker')) { return true; }
+var container = document.getElementById(arguments[0]) || document.body;
+return container.innerHTML !== arguments[1];
+"""
+
+# Turns off CSS transitions and animations on every page before it renders
+NO_ANIMATIONS_SCRIPT = """
+document.addEventListener('DOMContentLoaded', function () {
+  var style = document.createElement('style');
+  style.textContent = '*, *::before, *::after { transition: none !important; animation: none !important; }';
+  document.head.appendChild(style);
+});
+"""
+
+
+class WebScraper(BaseScraper):
+    def __init__(self, website_url=None, wait_timeouts=None, headless=None, profile_name="default",
+                 debugger_address=None):
+        """Initialize the web scraper by loading environment variables and setting up the browser.
+
+        Args:
+          - website_url: Document checklist website URL (falls back to DOCUMENT_CHECKLIST_WEBSITE).
+          - wait_timeouts: Optional dict overriding DEFAULT_WAIT_TIMEOUTS per step.
+          - headless: Run Chrome without a visible window (falls back to CHROME_HEADLESS, default on).
+          - profile_name: Sub-directory of CHROME_CACHE_DIR holding this browser's persistent profile.
+            Browsers running at the same time need different names (ScraperPool uses one per worker).
+          - debugger_address: host:port of an already running Chrome (falls back to
+            CHROME_DEBUGGER_ADDRESS) to attach to instead of launching a new one; "" always launches one.
+        """
+        config = load_config()
 
         # Load configuration from .env or use provided values
-        self.chromedriver_location = os.getenv("CHROMEDRIVER_LOCATION")
-        self.document_checklist_website = website_url if website_url else os.getenv("DOCUMENT_CHECKLIST_WEBSITE")
-        self.passport_field = os.getenv("PASSPORT_FIELD")
-        self.education_provider_field = os.getenv("EDUCATION_PROVIDER_FIELD")
+        self.chromedriver_location = config.get("CHROMEDRIVER_LOCATION")
+        self.document_checklist_website = website_url if website_url else config.get("DOCUMENT_CHECKLIST_WEBSITE")
+        self.passport_field = config.get("PASSPORT_FIELD")
+        self.education_provider_field = config.get("EDUCATION_PROVIDER_FIELD")
         self.submit_button_id = "btnSubmitEvidence"
+        self.evidence_container_id = config.get("EVIDENCE_CONTAINER_ID", "evidenceResults")
+
+        # Explicit wait configuration and a log of how long each wait actually took
+        self.wait_timeouts = dict(DEFAULT_WAIT_TIMEOUTS)
+        if wait_timeouts:
+            self.wait_timeouts.update(wait_timeouts)
+        BaseScraper.__init__(self)
 
         # Setup Selenium Chrome driver
+        if headless is None:
+            headless = config.flag("CHROME_HEADLESS", default=True)
+        self.headless = headless
+        self.profile_name = profile_name
+        self.debugger_address = (debugger_address if debugger_address is not None
+                                 else config.get("CHROME_DEBUGGER_ADDRESS"))
+        if self.debugger_address:
+            self.recycler = None  # A browser this scraper did not launch cannot be relaunched
+        self.launch_browser()
+
+    def launch_browser(self):
+        """Start Chrome (or attach to the running one) with resource blocking and no animations."""
         service = Service(self.chromedriver_location)
-        chrome_options = Options()
-        # chrome_options.add_argument("--headless")  # Uncomment for headless mode
+        if self.debugger_address:
+            # Attach to a browser that is already running, skipping the cold start
+            chrome_options = Options()
+            chrome_options.debugger_address = self.debugger_address
+        else:
+            profile_dir = os.path.join(load_config().get("CHROME_CACHE_DIR", ".chrome_cache"), self.profile_name)
+            chrome_options = self.performance_options(self.headless, os.path.abspath(profile_dir))
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
 
-        self.driver.implicitly_wait(5)  # Apply implicit wait globally
+        # Block images, fonts and analytics on every request and switch off animations
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NO_ANIMATIONS_SCRIPT})
+        except Exception as e:
+            print(f"Warning: could not apply resource blocking ({e})")
+
+        # Explicit waits are used for every step; an implicit wait would only add to their timeouts
+        self.driver.implicitly_wait(0)
+
+    @staticmethod
+    def performance_options(headless, profile_dir):
+        """Chrome options for fast lookups: eager page loads, no images or extensions, persistent cache."""
+        chrome_options = Options()
+        if headless:
+            chrome_options.add_argument("--headless=new")
+        # Return control once the DOM is ready instead of waiting for every subresource
+        chrome_options.page_load_strategy = "eager"
+        # Keep the HTTP cache and cookies between runs
+        chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+        for argument in ("--blink-settings=imagesEnabled=false", "--disable-extensions", "--disable-gpu",
+                         "--disable-dev-shm-usage", "--disable-background-networking", "--no-first-run",
+                         "--no-default-browser-check", "--mute-audio", "--window-size=1280,900"):
+            chrome_options.add_argument(argument)
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+        return chrome_options
 
     def open_website(self):
         """Open the target website."""
         self.driver.get(self.document_checklist_website)
+        self.current_provider = None  # A fresh page has no provider selected
         print("Website loaded successfully.")
 
-    def process_countries(self, countries, excel_handler, provider):
-        """
-        Loops through all countries, performs checks, and updates the ExcelHandler.
-        
-        Args:
-          - countries: List of country names from the ExcelHandler.
-          - excel_handler: Instance of ExcelHandler to store UNI1 and UNI2 results.
-          - provider: The education provider to select (university name from GUI or .env).
-        """
-        # Get university names from the excel_handler which now contains user-provided values
-        uni1 = excel_handler.uni1
-        uni2 = excel_handler.uni2
-        institution_selected = False  # Track if the institution is already selected
+    def wait_for(self, step, condition):
+        """Wait until `condition` holds, using the timeout configured for `step`, and log the time waited."""
+        timeout = self.wait_timeouts.get(step, DEFAULT_WAIT_TIMEOUTS.get(step, 5))
+        started = time.perf_counter()
+        try:
+            result = WebDriverWait(
+                self.driver, timeout, poll_frequency=0.1,
+                ignored_exceptions=(StaleElementReferenceException,)
+            ).until(condition)
+        except TimeoutException:
+            self.wait_log.append((step, time.perf_counter() - started, True))
+            raise TimeoutException(f"Timed out after {timeout}s waiting for step '{step}'")
+        self.wait_log.append((step, time.perf_counter() - started, False))
+        return result
+
+    @staticmethod
+    def _results_id(container_id):
+        """Map a select2 container id (select2-X-container) to its results list id (select2-X-results)."""
+        return container_id.replace("-container", "-results")
+
+    def _open_select2(self, container_id):
+        """Click a select2 dropdown and return its search box once it can be typed into."""
+        self.driver.find_element(By.ID, container_id).click()
+        return self.wait_for("dropdown_open",
+                             EC.element_to_be_clickable((By.CLASS_NAME, "select2-search__field")))
+
+    def _wait_for_select2_results(self, container_id):
+        """Wait until the select2 results list has finished loading and return the <li> elements."""
+        results_id = self._results_id(container_id)
 
-        for index, country in enumerate(countries):
-            print(f"Processing country: {country} with provider: {provider}")
-            self.select_country(country)
+        def results_loaded(driver):
+            li_elements = driver.find_element(By.ID, results_id).find_elements(By.TAG_NAME, "li")
+            if not li_elements:
+                return False
+            if any("loading-results" in (li.get_attribute("class") or "") for li in li_elements):
+                return False
+            return li_elements
 
-            if not institution_selected:  # Select institution only once
-                self.select_education_provider(provider)
-                institution_selected = True  # Mark institution as selected
+        return self.wait_for("search_results", results_loaded)
 
-            self.select_radio_option()
-            self.click_display_evidence()
-            contains_evidence = self.check_evidence_on_page()
+    def _wait_for_select2_closed(self, container_id):
+        """Wait until the select2 results list is gone, meaning the selection has been applied."""
+        self.wait_for("selection", EC.invisibility_of_element_located((By.ID, self._results_id(container_id))))
 
-            # Update the corresponding provider value based on the evidence check
-            if provider == uni1:
-                uni1_value = "Y" if contains_evidence else "N"
-                excel_handler.update_country_data(country, uni1_value, excel_handler.country_data[country][uni2])
-            elif provider == uni2:
-                uni2_value = "Y" if contains_evidence else "N"
-                excel_handler.update_country_data(country, excel_handler.country_data[country][uni1], uni2_value)
+    def fetch_option_lists(self):
+        """Return the passport country and provider dropdown options as {"countries": [...], "providers": [...]}."""
+        return {
+            "countries": self.driver.execute_script(OPTION_LIST_SCRIPT, self.native_select_id(self.passport_field)),
+            "providers": self.driver.execute_script(OPTION_LIST_SCRIPT, self.native_select_id(self.education_provider_field)),
+        }
 
-        print(f"All countries processed for provider: {provider}")
+    def _select_by_value(self, container_id, option):
+        """Pick a resolved (value, text) option without opening the select2 search.
+
+        Return False, leaving the dropdown alone, if the page has no option with that value and text
+        (the site renumbered or reordered its dropdown since the option index was built).
+        """
+        value, text = option
+        return self.driver.execute_script(SELECT_BY_VALUE_SCRIPT, self.native_select_id(container_id), value, text) == value
 
+    @timed_step("select_country", "Error selecting country")
     def select_country(self, country_name):
-        """Selects a country from the dropdown."""
-        try:
-            dropdown = self.driver.find_element(By.ID, self.passport_field)
-            dropdown.click()
-            time.sleep(1)  # Short wait for dropdown to activate
-
-            search_box = self.driver.find_element(By.CLASS_NAME, "select2-search__field")
-            search_box.send_keys(country_name)
-            time.sleep(2)  # Allow selection to process
-
-            searchbox_dropdown_ul = self.driver.find_element(By.ID, "select2-drpWebEvtCountryPassport-results")
-            li_elements = searchbox_dropdown_ul.find_elements(By.TAG_NAME, "li")
-            li_texts = [li.text for li in li_elements]
-            print(li_texts)
-            if any("No results found" in text for text in li_texts):
-                print(f"Country '{country_name}' not found in dropdown.")
-                search_box.clear()
-                search_box.send_keys(country_name[:4])
-                search_box.send_keys(Keys.ENTER)
-                time.sleep(2)  # Allow selection to process
-            else:
-                search_box.send_keys(Keys.ENTER)
-                print(f"Country '{country_name}' selected successfully.")
+        """Selects a country from the dropdown, by option value when it was resolved ahead of the run."""
+        option = self.resolved_options["countries"].get(country_name)
+        if option:
+            if self._select_by_value(self.passport_field, option):
+                print(f"Country '{option[1]}' selected by option value.")
+                return
+            self.refresh_resolved_options()
+            country_name = option[1]  # Search for the option text the name was resolved to
 
-        except Exception as e:
-            print(f"Error selecting country {country_name}: {e}")
+        search_box = self._open_select2(self.passport_field)
+        search_box.send_keys(country_name)
+
+        li_elements = self._wait_for_select2_results(self.passport_field)
+        li_texts = [li.text for li in li_elements]
+        print(li_texts)
+        if any("No results found" in text for text in li_texts):
+            print(f"Country '{country_name}' not found in dropdown.")
+            self.count_retry()
+            search_box.clear()
+            search_box.send_keys(country_name[:4])
+            li_elements = self._wait_for_select2_results(self.passport_field)
+            if any("No results found" in li.text for li in li_elements):
+                search_box.send_keys(Keys.ESCAPE)  # Leave the dropdown closed for the next lookup
+                raise PermanentStepError("no matching option")
+            search_box.send_keys(Keys.ENTER)
+        else:
+            search_box.send_keys(Keys.ENTER)
+            print(f"Country '{country_name}' selected successfully.")
+        self._wait_for_select2_closed(self.passport_field)
 
+    @timed_step("select_education_provider", "Error selecting provider")
     def select_education_provider(self, provider_name):
-        """Selects an education provider from the dropdown. This is only done once per loop."""
-        try:
-            dropdown = self.driver.find_element(By.ID, self.education_provider_field)
-            dropdown.click()
-            time.sleep(1)  # Allow dropdown to open
-
-            search_box = self.driver.find_element(By.CLASS_NAME, "select2-search__field")
-            search_box.send_keys(provider_name)
-            time.sleep(1)  # Allow options to populate
-
-            # Select the first result containing provider name
-            options = self.driver.find_elements(By.CLASS_NAME, "select2-results__option")
-            for option in options:
-                if provider_name in option.text:
-                    option.click()
-                    print(f"Selected {provider_name}.")
-                    break
-
-            time.sleep(1)  # Allow selection to process
-        except Exception as e:
-            print(f"Error selecting provider {provider_name}: {e}")
+        """Selects an education provider from the dropdown, by option value when it was resolved ahead of the run."""
+        option = self.resolved_options["providers"].get(provider_name)
+        if option:
+            if self._select_by_value(self.education_provider_field, option):
+                print(f"Selected {option[1]}.")
+                return
+            self.refresh_resolved_options()
+            provider_name = option[1]  # Search for the option text the name was resolved to
+
+        search_box = self._open_select2(self.education_provider_field)
+        search_box.send_keys(provider_name)
+
+        # Select the first result containing provider name
+        options = self._wait_for_select2_results(self.education_provider_field)
+        for option in options:
+            if provider_name in option.text:
+                option.click()
+                print(f"Selected {provider_name}.")
+                break
 
+        self._wait_for_select2_closed(self.education_provider_field)
+
+    @timed_step("select_radio_option", "Error selecting the radio button")
     def select_radio_option(self):
         """Selects the radio button from the image (for='01')."""
-        try:
-            radio_button = self.driver.find_element(By.ID, "01")  # ID is '01' on the website
-            radio_button.click()
-            print("Radio button selected successfully.")
-            time.sleep(1)  # Allow time for selection
-        except Exception as e:
-            print(f"Error selecting the radio button: {e}")
+        radio_button = self.wait_for("radio", EC.element_to_be_clickable((By.ID, "01")))  # ID is '01' on the website
+        radio_button.click()
+        print("Radio button selected successfully.")
 
+    @timed_step("click_display_evidence", "Error clicking the Display Evidence button")
     def click_display_evidence(self):
-        """Clicks the 'Display Evidence' button."""
-        try:
-            button = self.driver.find_element(By.ID, self.submit_button_id)
-            button.click()
-            time.sleep(3)  # Wait for the new data to load
-            print("Clicked 'Display Evidence' button.")
-        except Exception as e:
-            print(f"Error clicking the Display Evidence button: {e}")
+        """Clicks the 'Display Evidence' button and waits for the evidence section to be replaced.
+
+        The wait does not depend on <h3> headings, which neither the old nor the new page may have:
+        a marker is put into the results container first, and the reply has arrived once a full
+        postback has dropped it with the old document or a partial one has changed the container.
+        """
+        before = self.driver.execute_script(MARK_POSTBACK_SCRIPT, self.evidence_container_id)
+        button = self.driver.find_element(By.ID, self.submit_button_id)
+        button.click()
 
+        def evidence_replaced(driver):
+            return driver.execute_script(POSTBACK_DONE_SCRIPT, self.evidence_container_id, before)
+
+        self.wait_for("evidence", evidence_replaced)
+        print("Clicked 'Display Evidence' button.")
+
+    @timed_step("check_evidence_on_page", "Error checking evidence on page")
     def check_evidence_on_page(self):
         """Checks if 'Evidence of financial capacity' or 'Evidence of English language ability' appears inside <h3> tags."""
-        try:
-            h3_elements = self.driver.find_elements(By.XPATH, "//h3")
-            h3_texts = [h3.text.lower() for h3 in h3_elements]
+        # One round trip for the whole results section, parsed locally
+        html = self.driver.execute_script(EVIDENCE_HTML_SCRIPT, self.evidence_container_id)
+        self.last_evidence = parse_evidence(html)
+        self.last_fingerprint = self.fingerprint_headings(self.last_evidence["categories"])
 
-            contains_financial = any("evidence of financial capacity" in text for text in h3_texts)
-            contains_english = any("evidence of english language ability" in text for text in h3_texts)
-
-            if contains_financial or contains_english:
-                print("Evidence found on the page.")
-                return True
-            else:
-                print("No evidence found on the page.")
-                return False
-        except Exception as e:
-            print(f"Error checking evidence on page: {e}")
+        if self.headings_contain_evidence(self.last_evidence["categories"]):
+            print("Evidence found on the page.")
+            return True
+        else:
+            print("No evidence found on the page.")
             return False
 
     def close_browser(self):
         """Close the browser session."""
         self.driver.quit()
         print("Browser closed.")
+
+    def restart_browser(self):
+        """Quit Chrome, launch a fresh one with the same profile and load the website again."""
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"Warning: could not quit the browser cleanly ({e})")
+        self.launch_browser()
+        self.open_website()
+
+    def browser_rss_mb(self):
+        """Memory of chromedriver and the Chrome processes it started, in MB (None if unavailable)."""
+        process = getattr(self.driver.service, "process", None)
+        return process_tree_rss_mb(process.pid) if process else None